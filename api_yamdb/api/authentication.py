@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .caches import is_shared_cache
+
+User = get_user_model()
+
+USER_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+
+
+# Версия удалённого пользователя: ни один токен с ней не совпадает.
+DELETED = -1
+
+
+def claims_cache():
+    return caches[settings.AUTH_CACHE_ALIAS]
+
+
+def claims_version_key(user_id):
+    return f'auth-claims-version:{user_id}'
+
+
+def get_tokens_for_user(user):
+    """Выпускает пару токенов с данными, нужными для проверки прав."""
+    refresh = RefreshToken.for_user(user)
+    for claim in USER_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    refresh['claims_version'] = user.claims_version
+    remember_claims_version(user.pk, user.claims_version)
+    return refresh
+
+
+def remember_claims_version(user_id, version):
+    # add, а не set: версия, записанная при изменении пользователя, не
+    # должна перезаписываться прочитанной раньше неё.
+    if is_shared_cache(settings.AUTH_CACHE_ALIAS):
+        claims_cache().add(claims_version_key(user_id), version,
+                           settings.AUTH_USER_CACHE_TTL)
+
+
+def invalidate_user_claims(user_id, version=DELETED):
+    """Записывает текущую версию прав пользователя в общий кеш.
+
+    Токены с другой версией проверяются по основной БД. Если запись
+    вытеснена из кеша или кеш не общий, проверка тоже идёт по БД.
+    """
+    if is_shared_cache(settings.AUTH_CACHE_ALIAS):
+        claims_cache().set(claims_version_key(user_id), version,
+                           settings.AUTH_USER_CACHE_TTL)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без SELECT пользователя на каждый запрос.
+
+    Пользователь собирается из claims токена, если версия прав в токене
+    совпадает с версией в общем кеше AUTH_CACHE_ALIAS. Иначе — после
+    изменения прав, при промахе кеша или без общего кеша — данные
+    читаются из основной БД, а не с реплики.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        claims = self.get_token_claims(validated_token)
+        if claims is None:
+            claims = self.get_stored_claims(user_id)
+        return User(id=user_id, is_active=True, **claims)
+
+    @staticmethod
+    def get_token_claims(validated_token):
+        if not is_shared_cache(settings.AUTH_CACHE_ALIAS) or any(
+                claim not in validated_token
+                for claim in (*USER_CLAIMS, 'claims_version')):
+            return None
+        version = claims_cache().get(claims_version_key(
+            validated_token[api_settings.USER_ID_CLAIM]))
+        if version is None or version != validated_token['claims_version']:
+            return None
+        return {claim: validated_token[claim] for claim in USER_CLAIMS}
+
+    @staticmethod
+    def get_stored_claims(user_id):
+        if is_shared_cache(settings.AUTH_CACHE_ALIAS) and claims_cache().get(
+                claims_version_key(user_id)) == DELETED:
+            claims = None
+        else:
+            claims = User.objects.db_manager(DEFAULT_DB_ALIAS).filter(
+                pk=user_id, is_active=True
+            ).values(*USER_CLAIMS, 'claims_version').first()
+        if claims is None:
+            raise AuthenticationFailed(_('User not found'),
+                                       code='user_not_found')
+        remember_claims_version(user_id, claims.pop('claims_version'))
+        return claims
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+
+def is_shared_cache(alias=DEFAULT_CACHE_ALIAS):
+    """Проверяет, что кеш общий для всех процессов приложения.
+
+    Кеш в памяти процесса у каждого воркера gunicorn свой: изменение,
+    замеченное одним воркером, другие не видят. Всё, что полагается на
+    кеш для согласованности (версии ресурсов, версии прав пользователя),
+    без общего кеша должно отключаться, а не отдавать устаревшие данные.
+    """
+    return alias in settings.SHARED_CACHE_ALIASES
@@ -0,0 +1,146 @@
+"""Маршрутизация чтения на реплики PostgreSQL.
+
+Во время безопасных запросов (GET, HEAD) ORM читает с реплик из
+DATABASE_REPLICAS; реплика выбирается один раз на запрос. Первая запись
+закрепляет все последующие чтения за основной базой, чтобы запрос видел
+то, что сам записал. Вне запросов и внутри транзакций всё идёт в основную базу.
+Внутри блока primary_reads() чтение тоже идёт в основную базу.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+@contextmanager
+def replica_reads():
+    """Разрешает чтение с реплик внутри блока."""
+    token = _routing.set({'pinned': False, 'primary': 0, 'replica': None})
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Направляет чтение внутри блока в основную базу."""
+    state = _routing.get()
+    if state is None:
+        yield
+        return
+    state['primary'] += 1
+    try:
+        yield
+    finally:
+        state['primary'] -= 1
+
+
+class RoundRobinStrategy:
+
+    def __init__(self, aliases):
+        self._cycle = itertools.cycle(aliases)
+        self._lock = threading.Lock()
+
+    def choose(self):
+        with self._lock:
+            return next(self._cycle)
+
+
+class LatencyStrategy:
+    """Выбирает реплику с наименьшим сглаженным временем ответа.
+
+    Задержка замеряется запросом `SELECT 1` не чаще раза в
+    REPLICA_PING_INTERVAL секунд; недоступная реплика не выбирается,
+    пока не ответит снова.
+    """
+
+    smoothing = 0.3
+
+    def __init__(self, aliases):
+        self.aliases = aliases
+        self.latency = dict.fromkeys(aliases, 0.0)
+        self.checked_at = dict.fromkeys(aliases, 0.0)
+
+    def ping(self, alias):
+        start = time.perf_counter()
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Exception:
+            return float('inf')
+        return time.perf_counter() - start
+
+    def refresh(self):
+        now = time.monotonic()
+        for alias in self.aliases:
+            if now - self.checked_at[alias] < settings.REPLICA_PING_INTERVAL:
+                continue
+            self.checked_at[alias] = now
+            measured = self.ping(alias)
+            previous = self.latency[alias]
+            if measured == float('inf') or not previous:
+                self.latency[alias] = measured
+            else:
+                self.latency[alias] = (self.smoothing * measured
+                                       + (1 - self.smoothing) * previous)
+
+    def choose(self):
+        self.refresh()
+        alias = min(self.aliases, key=self.latency.__getitem__)
+        if self.latency[alias] == float('inf'):
+            return None
+        return alias
+
+
+STRATEGIES = {
+    'round_robin': RoundRobinStrategy,
+    'latency': LatencyStrategy,
+}
+
+_strategies = {}
+
+
+def get_strategy():
+    key = (settings.REPLICA_STRATEGY, tuple(settings.DATABASE_REPLICAS))
+    if key not in _strategies:
+        _strategies[key] = STRATEGIES[key[0]](list(key[1]))
+    return _strategies[key]
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if (state is None or state['pinned'] or state['primary']
+                or not settings.DATABASE_REPLICAS
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        # Все чтения одного запроса идут в одну реплику, чтобы, например,
+        # COUNT и выборка страницы не расходились из-за отставания.
+        if state['replica'] is None:
+            state['replica'] = get_strategy().choose()
+        return state['replica']
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state['pinned'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -1,13 +1,49 @@
 from django_filters import CharFilter
 from django_filters.rest_framework import FilterSet
-from reviews.models import Title
+from rest_framework.filters import SearchFilter
+from reviews.models import Category, Title
+
+from .search import search
+
+
+class TrigramSearchFilter(SearchFilter):
+    """SearchFilter по одному полю через триграммный поиск с ранжированием."""
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        search_fields = self.get_search_fields(view, request)
+        if not term or not search_fields:
+            return queryset
+        return search(queryset, search_fields[0], term)
+
+
+def split_slugs(value):
+    return [slug for slug in (part.strip() for part in value.split(','))
+            if slug]
 
 
 class TitleFilter(FilterSet):
-    genre = CharFilter(field_name='genre__slug', lookup_expr='icontains')
-    category = CharFilter(field_name='category__slug', lookup_expr='icontains')
-    name = CharFilter(field_name='name', lookup_expr='icontains')
+    genre = CharFilter(method='filter_genre')
+    category = CharFilter(method='filter_category')
+    genre_contains = CharFilter(field_name='genre__slug',
+                                lookup_expr='icontains', distinct=True)
+    category_contains = CharFilter(field_name='category__slug',
+                                   lookup_expr='icontains')
+    name = CharFilter(method='search_name')
 
     class Meta:
         model = Title
         fields = ['year']
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.filter(genres__slug_in=split_slugs(value))
+
+    def filter_category(self, queryset, name, value):
+        category_ids = list(Category.objects.filter(
+            slug__in=split_slugs(value)).values_list('id', flat=True))
+        if not category_ids:
+            return queryset.none()
+        return queryset.filter(category_id__in=category_ids)
+
+    def search_name(self, queryset, name, value):
+        return search(queryset, name, value)
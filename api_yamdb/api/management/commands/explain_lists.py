@@ -0,0 +1,102 @@
+import re
+
+from api.urls import router_v1
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import Http404
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+from reviews.models import Category, Comment, Genre, Review, Title
+
+# PostgreSQL: «Seq Scan on reviews_title»; SQLite: «SCAN TABLE
+# reviews_title» или «SCAN reviews_title» без «USING INDEX».
+SEQ_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*USING (?:COVERING )?'
+                         r'INDEX)'),
+}
+
+
+class Command(BaseCommand):
+    help = ('Выполняет EXPLAIN для запросов списков каждого ViewSet и '
+            'отмечает последовательное чтение таблиц')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='EXPLAIN ANALYZE (только PostgreSQL): выполнить запрос'
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan', action='store_true',
+            help='завершиться с ошибкой, если найдено последовательное чтение'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SEQ_SCAN:
+            raise CommandError(f'{connection.vendor} не поддерживается')
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options['analyze'] = True
+
+        flagged = []
+        for name, path, params, queryset in self.list_querysets():
+            plan = queryset.explain(**explain_options)
+            tables = sorted(set(SEQ_SCAN[connection.vendor].findall(plan)))
+            label = f'{name} {path}{"?" + params if params else ""}'
+            if tables:
+                flagged.append(label)
+                self.stdout.write(self.style.WARNING(
+                    f'{label}: последовательное чтение {", ".join(tables)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{label}: индексы'))
+            self.stdout.write(plan, style_func=lambda text: text)
+            self.stdout.write('')
+
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(
+                f'Последовательное чтение в {len(flagged)} запросах')
+
+    def list_querysets(self):
+        """Собирает запросы первой страницы списков, как их строит API.
+
+        Для вложенных маршрутов и фильтров берутся первые объекты из базы,
+        поэтому перед запуском её нужно наполнить данными.
+        """
+        review = Review.objects.order_by('pk').first()
+        comment = Comment.objects.order_by('pk').first()
+        title = Title.objects.order_by('pk').first()
+        kwargs = {
+            'title_id': str(review.title_id if review else 0),
+            'review_id': str(comment.review_id if comment else 0),
+        }
+        if comment:
+            kwargs['title_id'] = str(comment.review.title_id)
+        variants = {'titles': ['']}
+        category = Category.objects.order_by('pk').first()
+        genre = Genre.objects.order_by('pk').first()
+        if category:
+            variants['titles'].append(f'category={category.slug}')
+        if genre:
+            variants['titles'].append(f'genre={genre.slug}')
+        if title:
+            variants['titles'].append(f'year={title.year}')
+
+        factory = APIRequestFactory()
+        page_size = api_settings.PAGE_SIZE
+        for prefix, viewset, basename in router_v1.registry:
+            path = re.sub(r'\(\?P<(\w+)>[^)]+\)',
+                          lambda match: kwargs[match.group(1)], prefix)
+            for params in variants.get(basename, ['']):
+                view = viewset(action_map={'get': 'list'})
+                view.args = ()
+                view.kwargs = {key: value for key, value in kwargs.items()
+                               if f'<{key}>' in prefix}
+                view.format_kwarg = None
+                view.request = view.initialize_request(
+                    factory.get(f'/{path}/?{params}'))
+                try:
+                    queryset = view.filter_queryset(view.get_queryset())
+                except Http404:
+                    self.stderr.write(f'{basename}: нет данных, пропущено')
+                    continue
+                yield basename, path, params, queryset[:page_size]
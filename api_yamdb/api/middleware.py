@@ -0,0 +1,209 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+from .db_router import replica_reads
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger('api.timing')
+
+
+class QueryBudgetError(Exception):
+    pass
+
+
+class QueryStats:
+    """Обёртка execute_wrapper, считающая запросы и время работы с БД."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+def get_view_name(view_func, method):
+    """Возвращает имя вида DRF-представления: `TitleViewSet.list`."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return view_func.__name__
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        return f'{view_class.__name__}.{actions.get(method.lower())}'
+    if view_class.__name__ == 'WrappedAPIView':
+        return view_func.__name__
+    return f'{view_class.__name__}.{method.lower()}'
+
+
+class QueryCountMiddleware:
+    """Замеряет количество запросов, время БД и общее время запроса.
+
+    Результат отдаётся в заголовке Server-Timing и пишется в лог
+    `api.timing`. Если для представления задан бюджет в QUERY_BUDGETS и
+    он превышен, в режиме QUERY_BUDGET_STRICT выбрасывается исключение,
+    иначе пишется предупреждение.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        request.view_name = None
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = (
+            f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} '
+            f'queries", total;dur={total * 1000:.2f}'
+        )
+        logger.info(json.dumps({
+            'view': request.view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(stats.duration * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }))
+        self.check_budget(request.view_name, stats.count)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.view_name = get_view_name(view_func, request.method)
+
+    @staticmethod
+    def check_budget(view_name, count):
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is None or count <= budget:
+            return
+        message = (f'{view_name} выполнил {count} запросов к БД '
+                   f'при бюджете {budget}')
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetError(message)
+        logger.warning(message)
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтение безопасных запросов на реплики (см. db_router)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+        with replica_reads():
+            return self.get_response(request)
+
+
+def parse_accept_encoding(header):
+    """Возвращает кодировки из Accept-Encoding с их весами q."""
+    weights = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+    return weights
+
+
+def compress_brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for item in sequence:
+        yield compressor.process(item) + compressor.flush()
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Сжимает ответы brotli или gzip по заголовку Accept-Encoding.
+
+    Из кодировок, которые принимает клиент, выбирается самая весомая; при
+    равных весах brotli (если пакет установлен) предпочтительнее gzip.
+    Ответы короче COMPRESSION_MIN_SIZE байт и уже сжатые не трогаются,
+    а сжатый ответ, который вышел не короче исходного, не отдаётся.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.codings = ('br', 'gzip') if brotli else ('gzip',)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header('Content-Encoding') or (
+                not response.streaming
+                and len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = self.choose_coding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if coding == 'br':
+                response.streaming_content = compress_brotli_sequence(
+                    response.streaming_content,
+                    settings.COMPRESSION_BROTLI_QUALITY)
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content)
+            del response['Content-Length']
+        else:
+            if coding == 'br':
+                content = brotli.compress(
+                    response.content,
+                    quality=settings.COMPRESSION_BROTLI_QUALITY)
+            else:
+                content = compress_string(response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # Сжатое представление отличается побайтно, поэтому ETag становится
+        # слабым; условные запросы с ним по-прежнему совпадают.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = coding
+        return response
+
+    def choose_coding(self, header):
+        weights = parse_accept_encoding(header)
+        default = weights.get('*', 0.0)
+        best, best_weight = None, 0.0
+        for coding in self.codings:
+            weight = weights.get(coding, default)
+            if weight > best_weight:
+                best, best_weight = coding, weight
+        return best
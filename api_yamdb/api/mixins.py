@@ -1,7 +1,312 @@
-from rest_framework import mixins, viewsets
+import hashlib
+import time
+from abc import ABCMeta, abstractmethod
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from reviews.signals import bulk_saved
+
+from .caches import is_shared_cache
+from .db_router import primary_reads
+from .permissions import IsAdmin
+from .rows import get_row_mapper
+from .versions import get_versions
 
 
 class CreateObjectViewSet(mixins.CreateModelMixin, mixins.ListModelMixin,
                           mixins.DestroyModelMixin,
                           viewsets.GenericViewSet):
     pass
+
+
+class BulkUpsertMixin(metaclass=ABCMeta):
+    """Добавляет POST `<prefix>/bulk/` для записи списка объектов.
+
+    Все элементы проверяются `bulk_serializer_class` с общим контекстом из
+    `get_bulk_context`, который собирает нужные справочники одним
+    запросом. Если хоть один элемент некорректен, ничего не пишется и
+    возвращаются ошибки по индексам элементов; иначе `bulk_save`
+    записывает всё в одной транзакции. Первичные ключи записанных строк
+    `bulk_save` кладёт в context['saved_pks'] для сигнала bulk_saved.
+    """
+
+    bulk_serializer_class = None
+
+    @action(detail=False, methods=['POST'], permission_classes=[IsAdmin])
+    def bulk(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                data={'error': 'expected a list of objects'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        items = [item for item in request.data if isinstance(item, dict)]
+        context = self.get_bulk_context(items)
+        validated, errors = [], []
+        for index, item in enumerate(request.data):
+            serializer = self.bulk_serializer_class(data=item, context=context)
+            if serializer.is_valid():
+                validated.append(serializer.validated_data)
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+        if errors:
+            return Response(data={'errors': errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            result = self.bulk_save(validated, context)
+        bulk_saved.send(sender=self.queryset.model,
+                        pks=context.get('saved_pks'))
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    def get_bulk_context(self, items):
+        return {'seen': set()}
+
+    @abstractmethod
+    def bulk_save(self, items, context):
+        """Записывает проверенные элементы и возвращает тело ответа."""
+
+
+class SlugBulkUpsertMixin(BulkUpsertMixin):
+    """Создаёт объекты с новыми slug и переименовывает существующие."""
+
+    def get_bulk_context(self, items):
+        context = super().get_bulk_context(items)
+        slugs = [item.get('slug') for item in items
+                 if isinstance(item.get('slug'), str)]
+        context['existing'] = self.queryset.model.objects.in_bulk(
+            slugs, field_name='slug')
+        return context
+
+    def bulk_save(self, items, context):
+        model = self.queryset.model
+        existing = context['existing']
+        created = [model(**item) for item in items
+                   if item['slug'] not in existing]
+        updated = []
+        for item in items:
+            if item['slug'] in existing:
+                existing[item['slug']].name = item['name']
+                updated.append(existing[item['slug']])
+        model.objects.bulk_create(created)
+        model.objects.bulk_update(updated, ['name'])
+        # Без RETURNING у созданных объектов нет pk, но на них ещё
+        # ничто не ссылается.
+        context['saved_pks'] = [obj.pk for obj in created + updated
+                                if obj.pk is not None]
+        return {
+            'created': [obj.slug for obj in created],
+            'updated': [obj.slug for obj in updated],
+        }
+
+
+class VersionedReadMixin:
+    """Основа для обработчиков чтения, зависящих от версий ресурсов.
+
+    Для GET-запросов к действиям `read_actions` обработчик оборачивается
+    методом `wrap_read_handler` уже после аутентификации и проверки прав.
+    Версии ресурсов `version_resources` обновляются сигналами при
+    изменении моделей (см. api.versions).
+
+    Версия поднимается записью в основную базу, а реплика догоняет её с
+    отставанием. Чтобы ответ с реплики не попал в кеш и в ETag под новой
+    версией, в течение REPLICA_LAG_WINDOW секунд после изменения чтение
+    идёт в основную базу. Изменения из других процессов видны только
+    через общий кеш (SHARED_CACHE_ALIASES).
+    """
+
+    version_resources = ()
+    read_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method == 'GET' and self.action in self.read_actions:
+            self.get = self.wrap_read_handler(self.get)
+
+    def wrap_read_handler(self, handler):
+
+        def read(request, *args, **kwargs):
+            if not self.is_recently_changed():
+                return handler(request, *args, **kwargs)
+            with primary_reads():
+                return handler(request, *args, **kwargs)
+
+        return read
+
+    def is_recently_changed(self):
+        if not settings.DATABASE_REPLICAS or not self.version_resources:
+            return False
+        changed_at = max(self.get_resource_versions())
+        return time.time() - changed_at < settings.REPLICA_LAG_WINDOW
+
+    def get_resource_versions(self):
+        if not hasattr(self, '_resource_versions'):
+            self._resource_versions = get_versions(self.version_resources)
+        return self._resource_versions
+
+    def get_representation_key(self, request):
+        return hashlib.md5(repr((
+            self.get_resource_versions(), request.get_full_path(),
+            request.META.get('HTTP_ACCEPT')
+        )).encode()).hexdigest()
+
+
+class ConditionalGetMixin(VersionedReadMixin):
+    """Отвечает 304 Not Modified на условный GET без запроса к БД.
+
+    ETag строится из версий ресурсов в кеше. Если кеш не общий, другой
+    воркер может не знать об изменении и подтвердить устаревший ETag,
+    поэтому без общего кеша ETag и 304 не выдаются.
+    """
+
+    def wrap_read_handler(self, handler):
+        handler = super().wrap_read_handler(handler)
+
+        def conditional_get(request, *args, **kwargs):
+            if not is_shared_cache():
+                return handler(request, *args, **kwargs)
+            etag = quote_etag(self.get_representation_key(request))
+            last_modified = int(max(self.get_resource_versions()))
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = handler(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+            return response
+
+        return conditional_get
+
+
+class CachedResponseMixin(VersionedReadMixin):
+    """Кеширует готовые ответы на анонимные GET-запросы.
+
+    Ключ включает путь, строку запроса и версии ресурсов, поэтому после
+    изменения данных старые страницы просто перестают находиться. Версии и
+    ответы в кеше памяти процесса у каждого воркера свои, поэтому без
+    общего кеша (SHARED_CACHE_ALIASES) ответы не кешируются.
+    """
+
+    def wrap_read_handler(self, handler):
+        handler = super().wrap_read_handler(handler)
+
+        def cached_get(request, *args, **kwargs):
+            if request.user.is_authenticated or not is_shared_cache():
+                return handler(request, *args, **kwargs)
+            key = f'response:{self.get_representation_key(request)}'
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(
+                        key, (rendered.content, rendered['Content-Type']),
+                        settings.RESPONSE_CACHE_TIMEOUT
+                    )
+                )
+            return response
+
+        return cached_get
+
+
+def get_keyset_fields(view):
+    """Поля ключа, если пагинация представления умеет выводить по ключу."""
+    keyset_class = getattr(view.paginator, 'keyset_class', None)
+    if keyset_class is None:
+        return ()
+    return getattr(view, 'keyset_ordering', keyset_class.default_ordering)
+
+
+class ValuesListMixin:
+    """Отдаёт list() из `.values()` через RowMapper, минуя сериализатор.
+
+    Ответ тот же, что у `serializer_class`; если сериализатор разобрать не
+    удалось или быстрый путь выключен настройкой VALUES_FAST_PATH,
+    работает обычный ListModelMixin.list.
+    """
+
+    def list(self, request, *args, **kwargs):
+        mapper = None
+        if settings.VALUES_FAST_PATH:
+            mapper = get_row_mapper(self.get_serializer())
+        if mapper is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Постраничный вывод по ключу берёт позицию из последней строки,
+        # поэтому поля ключа должны быть в .values().
+        queryset = queryset.values(*mapper.columns,
+                                   *self.get_values_ordering(mapper))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response([mapper(row) for row in queryset])
+        return self.get_paginated_response([mapper(row) for row in page])
+
+    def get_values_ordering(self, mapper):
+        return [field for field in get_keyset_fields(self)
+                if field not in mapper.columns]
+
+
+class SparseFieldsMixin:
+    """Сужает выборку под поля из `?fields=` и `?expand=`.
+
+    Поля ответа выбирает сериализатор (см. SparseFieldsSerializerMixin),
+    а здесь по ним строятся `.only()` и `select_related`: не запрошенные
+    колонки не читаются, связи, которые не выводятся или выводятся как
+    id, не присоединяются, а у связи, выведенной как slug, читается одна
+    колонка. SerializerMethodField может обращаться к любым атрибутам
+    объекта, поэтому `.only()` применяется, только если его колонки
+    перечислены в `method_field_sources` сериализатора.
+    """
+
+    sparse_query_params = ('fields', 'expand')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in ('GET', 'HEAD') or not any(
+                param in self.request.query_params
+                for param in self.sparse_query_params):
+            return queryset
+        only, related = self.get_sparse_columns(self.get_serializer())
+        if only is None:
+            return queryset
+        if self.action == 'list':
+            only.extend(get_keyset_fields(self))
+        queryset = queryset.select_related(None).only(*only)
+        if not related:
+            return queryset
+        return queryset.select_related(*related)
+
+    @staticmethod
+    def get_sparse_columns(serializer):
+        """Возвращает (колонки для .only(), связи для select_related).
+
+        Если колонки неизвестны, возвращает (None, None).
+        """
+        only, related = [], []
+        sources = getattr(serializer, 'method_field_sources', {})
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in sources:
+                    return None, None
+                only.extend(sources[name])
+                continue
+            if field.source == '*':
+                continue
+            source = field.source.replace('.', '__')
+            only.append(source)
+            if isinstance(field, serializers.Serializer):
+                related.append(source)
+                only.extend(f'{source}__{nested.source}'
+                            for nested in field.fields.values())
+            elif isinstance(field, serializers.SlugRelatedField):
+                related.append(source)
+                only.append(f'{source}__{field.slug_field}')
+        return only, related
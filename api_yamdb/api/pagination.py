@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, LimitOffsetPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Постраничный вывод по ключу `(pub_date, id)` без COUNT и OFFSET.
+
+    Позиция последнего объекта страницы кодируется в параметре `cursor`,
+    а следующая страница выбирается условием `WHERE (pub_date, id) > ...`,
+    поэтому время ответа не зависит от глубины страницы. Поля ключа
+    можно переопределить атрибутом `keyset_ordering` представления.
+    """
+
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_ordering = ('pub_date', 'id')
+    max_limit = 1000
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = getattr(view, 'keyset_ordering',
+                                self.default_ordering)
+        self.model = queryset.model
+        limit = self.get_limit(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+        page = list(queryset[:limit + 1])
+        self.has_next = len(page) > limit
+        page = page[:limit]
+        self.next_position = None
+        if self.has_next:
+            last = page[-1]
+            if isinstance(last, dict):
+                self.next_position = [last[field] for field in self.ordering]
+            else:
+                self.next_position = [
+                    getattr(last, field) for field in self.ordering
+                ]
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return min(max(limit, 1), self.max_limit)
+
+    def get_position_filter(self, position):
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            equal = {
+                name: value
+                for name, value in zip(self.ordering[:index], position)
+            }
+            conditions.append(Q(**equal, **{f'{field}__gt': position[index]}))
+        return reduce(lambda left, right: left | right, conditions)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param,
+            self.encode_cursor(self.next_position)
+        )
+
+    def encode_cursor(self, position):
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in position
+        ]
+        return base64.urlsafe_b64encode(
+            json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class KeysetOptInMixin:
+    """Включает постраничный вывод по ключу параметром `?cursor=`.
+
+    Без параметра `cursor` работает прежний класс пагинации, так что
+    существующие клиенты ничего не замечают.
+    """
+
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class LimitOffsetOrKeysetPagination(KeysetOptInMixin, LimitOffsetPagination):
+    pass
+
+
+class PageNumberOrKeysetPagination(KeysetOptInMixin, PageNumberPagination):
+    pass
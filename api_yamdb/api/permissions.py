@@ -65,6 +65,6 @@ class IsAuthorOrAdminOrModerator(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return (obj.author == request.user
+        return (obj.author_id == request.user.id
                 or request.user.is_admin
                 or request.user.is_moderator)
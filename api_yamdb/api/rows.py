@@ -0,0 +1,105 @@
+"""Быстрое представление списков из строк `.values()`.
+
+Сериализатор DRF на каждый объект заново проходит по полям и вызывает
+`to_representation` для каждого атрибута. `RowMapper` один раз разбирает
+поля сериализатора, решает, какие колонки нужны из `.values()` и как
+превратить каждую колонку в значение ответа, и компилирует из этого одно
+выражение-словарь. Результат совпадает с `serializer.data` байт в байт;
+если в сериализаторе есть поле, которое так не разобрать (например,
+SerializerMethodField), маппер не строится и список отдаёт сериализатор.
+"""
+from rest_framework import serializers
+from rest_framework.fields import _UnvalidatedField
+
+# Поля, для которых значение из базы уже совпадает с представлением.
+PLAIN_FIELDS = (serializers.BooleanField, serializers.CharField,
+                serializers.FloatField, serializers.IntegerField)
+CONVERTED_FIELDS = (serializers.DateField, serializers.DateTimeField,
+                    serializers.DecimalField)
+
+
+class UnsupportedFieldError(Exception):
+    pass
+
+
+def _path(prefix, source):
+    if source == '*' or not source:
+        raise UnsupportedFieldError(source)
+    return prefix + source.replace('.', '__')
+
+
+class RowMapper:
+    """Функция «строка .values() → словарь», собранная по сериализатору."""
+
+    def __init__(self, serializer):
+        self.columns = []
+        self.namespace = {}
+        self.source = f'lambda row: {self.compile_serializer(serializer, "")}'
+        self.build = eval(self.source, self.namespace)
+
+    def __call__(self, row):
+        return self.build(row)
+
+    def column(self, name):
+        if name not in self.columns:
+            self.columns.append(name)
+        return f'row[{name!r}]'
+
+    def converter(self, to_representation):
+        name = f'convert_{len(self.namespace)}'
+        self.namespace[name] = to_representation
+        return name
+
+    def compile_serializer(self, serializer, prefix):
+        items = ', '.join(
+            f'{name!r}: {self.compile_field(field, prefix)}'
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        )
+        return f'{{{items}}}'
+
+    def compile_field(self, field, prefix):
+        """Возвращает выражение Python для значения поля в строке `row`."""
+        if isinstance(field, serializers.ListSerializer):
+            raise UnsupportedFieldError(field)
+        if isinstance(field, serializers.Serializer):
+            path = _path(prefix, field.source)
+            key = self.column(f'{path}__pk')
+            nested = self.compile_serializer(field, f'{path}__')
+            return f'(None if {key} is None else {nested})'
+        if isinstance(field, serializers.SlugRelatedField):
+            path = _path(prefix, field.source)
+            return self.column(f'{path}__{field.slug_field}')
+        if (isinstance(field, serializers.PrimaryKeyRelatedField)
+                and field.pk_field is None):
+            return self.column(f'{_path(prefix, field.source)}__pk')
+        if (isinstance(field, serializers.ListField)
+                and isinstance(field.child, _UnvalidatedField)):
+            return self.column(_path(prefix, field.source))
+        if isinstance(field, PLAIN_FIELDS):
+            return self.column(_path(prefix, field.source))
+        if isinstance(field, CONVERTED_FIELDS):
+            value = self.column(_path(prefix, field.source))
+            convert = self.converter(field.to_representation)
+            return f'(None if {value} is None else {convert}({value}))'
+        raise UnsupportedFieldError(field)
+
+
+_mappers = {}
+
+
+def get_row_mapper(serializer):
+    """Возвращает маппер для сериализатора или None, если поле не разобрать.
+
+    Набор полей может зависеть от запроса (см. CommentSerializer и
+    SparseFieldsSerializerMixin), поэтому мапперы кешируются по классу
+    сериализатора, именам и типам его полей.
+    """
+    key = (type(serializer), tuple(
+        (name, type(field)) for name, field in serializer.fields.items()))
+    if key not in _mappers:
+        try:
+            _mappers[key] = RowMapper(serializer)
+        except UnsupportedFieldError:
+            _mappers[key] = None
+    return _mappers[key]
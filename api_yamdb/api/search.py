@@ -0,0 +1,129 @@
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+
+from .caches import is_shared_cache
+from .versions import MODEL_RESOURCES, get_versions
+
+
+def get_trigrams(text):
+    text = text.lower()
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def similarity(left, right):
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class TrigramIndex:
+    """Инвертированный триграммный индекс поля модели в памяти процесса.
+
+    Используется вместо GIN-индекса pg_trgm, когда база не PostgreSQL
+    (SQLite в тестах и при разработке). Индекс строится лениво при
+    первом поиске и сбрасывается сигналами при изменении модели.
+
+    Сигналы видит только процесс, изменивший данные. С общим кешем индекс
+    помнит версии ресурсов модели (см. api.versions), с которыми он
+    построен, и перестраивается, когда их поднял любой процесс. Без общего
+    кеша индекс годится только для одного процесса (runserver, тесты).
+    """
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.resources = MODEL_RESOURCES.get(model._meta.label, ())
+        self.lock = threading.Lock()
+        self.documents = None
+        self.postings = None
+        self.versions = None
+
+    def invalidate(self):
+        with self.lock:
+            self.documents = None
+            self.postings = None
+
+    def get_versions(self):
+        if not self.resources or not is_shared_cache():
+            return None
+        return get_versions(self.resources)
+
+    def build(self):
+        documents = {}
+        postings = defaultdict(set)
+        for pk, text in self.model.objects.values_list('pk', self.field):
+            documents[pk] = (text.lower(), get_trigrams(text))
+            for trigram in documents[pk][1]:
+                postings[trigram].add(pk)
+        self.documents = documents
+        self.postings = postings
+
+    def search(self, term):
+        """Возвращает id документов, содержащих term, по убыванию сходства."""
+        term = term.lower()
+        term_trigrams = get_trigrams(term)
+        # Версии читаются до построения: изменение во время build()
+        # поднимет их ещё раз, и следующий поиск перестроит индекс.
+        versions = self.get_versions()
+        with self.lock:
+            if self.documents is None or versions != self.versions:
+                self.build()
+                self.versions = versions
+            documents = self.documents
+            if term_trigrams:
+                candidates = set.intersection(*(
+                    self.postings.get(trigram, set())
+                    for trigram in term_trigrams
+                ))
+            else:
+                candidates = documents.keys()
+        matches = [
+            (similarity(term_trigrams, documents[pk][1]), pk)
+            for pk in candidates if term in documents[pk][0]
+        ]
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return [pk for _, pk in matches]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(model, field):
+    key = (model._meta.label, field)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = TrigramIndex(model, field)
+        return _indexes[key]
+
+
+def invalidate_indexes(model):
+    label = model._meta.label
+    for (index_label, _), index in list(_indexes.items()):
+        if index_label == label:
+            index.invalidate()
+
+
+def search(queryset, field, term):
+    """Ищет подстроку term в поле field и сортирует по релевантности.
+
+    В PostgreSQL фильтр icontains обслуживается GIN-индексом pg_trgm, а
+    порядок задаёт TrigramSimilarity; в остальных базах используется
+    TrigramIndex в памяти процесса.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        return queryset.filter(**{f'{field}__icontains': term}).annotate(
+            rank=TrigramSimilarity(field, term)
+        ).order_by('-rank', field)
+    ids = get_index(queryset.model, field).search(term)
+    if not ids:
+        return queryset.none()
+    return queryset.filter(pk__in=ids).order_by(Case(
+        *[When(pk=pk, then=Value(position))
+          for position, pk in enumerate(ids)],
+        output_field=IntegerField()
+    ))
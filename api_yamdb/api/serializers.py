@@ -1,15 +1,77 @@
+from collections import OrderedDict
+
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.utils import timezone
+from django.utils.text import Truncator
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.validators import UniqueTogetherValidator
 from reviews.models import Category, Comment, Genre, Review, Title
 
+from .filters import split_slugs
+
 User = get_user_model()
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+def parse_names(value):
+    """Разбирает `a,b,c` из параметра запроса; None, если его нет."""
+    if value is None:
+        return None
+    return split_slugs(value)
+
+
+class SparseFieldsSerializerMixin:
+    """Поля ответа по параметрам `?fields=` и `?expand=` GET-запроса.
+
+    `fields` оставляет только перечисленные поля. Связи из
+    `compact_fields` по умолчанию вложены целиком; если передан `expand`,
+    вложенными остаются только перечисленные в нём, остальные заменяются
+    компактным полем: id (без JOIN) или slug (JOIN читает одну колонку).
+    Неизвестные имена — ошибка 400.
+
+    `method_field_sources` перечисляет колонки, которые читают
+    SerializerMethodField (см. SparseFieldsMixin).
+    """
+
+    compact_fields = {}
+    method_field_sources = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return fields
+        requested = parse_names(request.query_params.get('fields'))
+        expand = parse_names(request.query_params.get('expand'))
+        errors = {}
+        if requested is not None:
+            unknown = [name for name in requested if name not in fields]
+            if unknown:
+                errors['fields'] = f'неизвестные поля: {", ".join(unknown)}'
+            fields = OrderedDict((name, field)
+                                 for name, field in fields.items()
+                                 if name in requested)
+        if expand is not None:
+            unknown = [name for name in expand
+                       if name not in self.compact_fields]
+            if unknown:
+                errors['expand'] = (
+                    f'нельзя развернуть: {", ".join(unknown)}')
+            for name, make_field in self.compact_fields.items():
+                if name in fields and name not in expand:
+                    fields[name] = make_field()
+        if errors:
+            raise ValidationError(errors)
+        return fields
+
+
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
+    compact_fields = {
+        'title': lambda: serializers.PrimaryKeyRelatedField(read_only=True),
+    }
+
     title = serializers.SlugRelatedField(
         slug_field='name',
         read_only=True,
@@ -24,9 +86,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         request = self.context['request']
         if request.method != 'POST':
             return data
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        if title.reviews.filter(author=request.user).exists():
+        title = self.context['view'].get_title()
+        if Review.objects.filter(title=title, author=request.user).exists():
             raise ValidationError('You are allowed to leave only one'
                                   ' review')
         return data
@@ -36,11 +97,14 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class CommentSerializer(serializers.ModelSerializer):
-    review = serializers.SlugRelatedField(
-        slug_field='text',
-        read_only=True
-    )
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
+    EXCERPT_LENGTH = 100
+    # Отрывок берётся из отзыва представления, а не из комментария.
+    method_field_sources = {'review_excerpt': ()}
+
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
+    review_excerpt = serializers.SerializerMethodField()
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True
@@ -50,6 +114,18 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = '__all__'
         model = Comment
 
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.query_params.get(
+                'review_excerpt', '').lower() not in ('1', 'true'):
+            fields.pop('review_excerpt', None)
+        return fields
+
+    def get_review_excerpt(self, obj):
+        review = self.context['view'].get_review()
+        return Truncator(review.text).chars(self.EXCERPT_LENGTH)
+
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -81,14 +157,20 @@ class GenreSerializer(serializers.ModelSerializer):
         ]
 
 
-class TitleListSerializer(serializers.ModelSerializer):
+class TitleListSerializer(SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
+    compact_fields = {
+        'category': lambda: serializers.SlugRelatedField(
+            slug_field='slug', read_only=True),
+    }
 
-    genre = GenreSerializer(many=True, required=True)
+    # Те же name и slug, что отдал бы GenreSerializer, но из Title.genres.
+    genre = serializers.ListField(source='genres', read_only=True)
     category = CategorySerializer(required=True)
     rating = serializers.FloatField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('review_count', 'score_sum', 'genres')
         model = Title
 
 
@@ -115,6 +197,63 @@ class TitleSerializer(serializers.ModelSerializer):
         return data
 
 
+class SlugBulkSerializer(serializers.ModelSerializer):
+    slug = serializers.SlugField(max_length=50)
+
+    def validate_slug(self, value):
+        if value in self.context['seen']:
+            raise serializers.ValidationError('slug повторяется в запросе')
+        self.context['seen'].add(value)
+        return value
+
+
+class GenreBulkSerializer(SlugBulkSerializer):
+    class Meta:
+        fields = ('name', 'slug')
+        model = Genre
+
+
+class CategoryBulkSerializer(SlugBulkSerializer):
+    class Meta:
+        fields = ('name', 'slug')
+        model = Category
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """Элемент массовой записи; slug заменяются на id по словарям контекста."""
+
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+    class Meta:
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
+        model = Title
+
+    def validate_id(self, value):
+        if value not in self.context['existing']:
+            raise serializers.ValidationError(
+                f'произведение {value} не найдено')
+        if value in self.context['seen']:
+            raise serializers.ValidationError('id повторяется в запросе')
+        self.context['seen'].add(value)
+        return value
+
+    def validate_genre(self, value):
+        genres = self.context['genres']
+        missing = [slug for slug in value if slug not in genres]
+        if missing:
+            raise serializers.ValidationError(
+                f'жанры не найдены: {", ".join(missing)}')
+        return list(dict.fromkeys(genres[slug] for slug in value))
+
+    def validate_category(self, value):
+        if value not in self.context['categories']:
+            raise serializers.ValidationError(
+                f'категория {value} не найдена')
+        return self.context['categories'][value]
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('email', 'role', 'first_name',
@@ -122,10 +261,12 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
 
 
-class UserCreateSerializer(serializers.ModelSerializer):
-    class Meta:
-        fields = ('email', 'username')
-        model = User
+class UserCreateSerializer(serializers.Serializer):
+    # Уникальность проверяет сама база при регистрации, поэтому здесь нет
+    # валидаторов ModelSerializer, делающих по запросу на каждое поле.
+    email = serializers.EmailField(max_length=254)
+    username = serializers.CharField(
+        max_length=150, validators=[UnicodeUsernameValidator()])
 
 
 class TokenSerializer(serializers.Serializer):
@@ -0,0 +1,75 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Genre, Title
+from reviews.signals import bulk_saved
+
+from .authentication import invalidate_user_claims
+from .search import invalidate_indexes
+from .versions import bump_model_versions
+
+User = get_user_model()
+
+
+def is_idle(connection, now):
+    idle_since = getattr(connection, 'idle_since', None)
+    return idle_since is None or now - idle_since >= (
+        connection.settings_dict.get('CONN_HEALTH_CHECK_IDLE', 0))
+
+
+@receiver(request_started)
+def check_connections_health(**kwargs):
+    # Постоянное соединение могло оборваться между запросами (перезапуск
+    # PostgreSQL, таймаут на балансировщике). Такое соединение закрываем
+    # заранее, чтобы запрос открыл новое, а не упал с ошибкой. Проверка —
+    # это запрос к базе, поэтому проверяются только соединения, простоявшие
+    # дольше CONN_HEALTH_CHECK_IDLE секунд.
+    now = time.monotonic()
+    for connection in connections.all():
+        if (connection.settings_dict.get('CONN_HEALTH_CHECKS')
+                and connection.connection is not None
+                and not connection.in_atomic_block
+                and is_idle(connection, now)
+                and not connection.is_usable()):
+            connection.close()
+
+
+@receiver(request_finished)
+def mark_connections_idle(**kwargs):
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.idle_since = now
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_user_claims(instance.pk, instance.claims_version)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_cache(sender, instance, **kwargs):
+    invalidate_user_claims(instance.pk)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(bulk_saved)
+def invalidate_search_indexes(sender, **kwargs):
+    invalidate_indexes(sender)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(m2m_changed)
+@receiver(bulk_saved)
+def bump_resource_versions(sender, **kwargs):
+    bump_model_versions(sender)
@@ -0,0 +1,55 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Какие ресурсы API меняются при изменении модели. Произведения зависят
+# от жанров, категорий и отзывов (рейтинг), отзывы — от названия
+# произведения, отзывы и комментарии — от username автора.
+MODEL_RESOURCES = {
+    'reviews.Title': ('titles', 'reviews'),
+    'reviews.GenreTitle': ('titles',),
+    'reviews.Genre': ('genres', 'titles'),
+    'reviews.Category': ('categories', 'titles'),
+    'reviews.Review': ('titles', 'reviews', 'comments'),
+    'reviews.Comment': ('comments',),
+    'users.User': ('reviews', 'comments'),
+}
+
+
+def version_key(resource):
+    return f'resource-version:{resource}'
+
+
+def get_versions(resources):
+    """Возвращает время последнего изменения каждого ресурса.
+
+    Если версии нет в кеше (первый запрос или очистка кеша), она
+    выставляется в текущее время: так после потери кеша клиенты получат
+    новый ETag, а не старый, совпадающий с другими данными.
+    """
+    keys = [version_key(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    now = time.time()
+    for key in keys:
+        if key not in versions:
+            cache.add(key, now, None)
+            versions[key] = cache.get(key, now)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(resources):
+    now = time.time()
+    cache.set_many(
+        {version_key(resource): now for resource in resources}, None)
+
+
+def bump_model_versions(model):
+    resources = MODEL_RESOURCES.get(model._meta.label)
+    if not resources:
+        return
+    bump_versions(resources)
+    # Внутри транзакции изменение ещё не видно другим запросам: то, что
+    # они прочитают до коммита, не должно остаться под новой версией.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_versions(resources))
@@ -1,87 +1,129 @@
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, connections, router, transaction
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.generics import get_object_or_404
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.export import EXPORT_FORMATS, iter_titles
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, deferred_genre_refresh,
+                            schedule_genre_refresh)
+from users.confirmation import check_confirmation_code, make_confirmation_code
 from users.models import User
+from users.outbox import enqueue_email
 
 from api_yamdb import settings
 
-from .filters import TitleFilter
-from .mixins import CreateObjectViewSet
+from .authentication import get_tokens_for_user
+from .filters import TitleFilter, TrigramSearchFilter
+from .mixins import (BulkUpsertMixin, CachedResponseMixin, ConditionalGetMixin,
+                     CreateObjectViewSet, SlugBulkUpsertMixin,
+                     SparseFieldsMixin, ValuesListMixin)
+from .pagination import (LimitOffsetOrKeysetPagination,
+                         PageNumberOrKeysetPagination)
 from .permissions import IsAdmin, IsAdminOrReadOnly, IsAuthorOrAdminOrModerator
-from .serializers import (CategorySerializer, CommentSerializer,
+from .serializers import (CategoryBulkSerializer, CategorySerializer,
+                          CommentSerializer, GenreBulkSerializer,
                           GenreSerializer, ReviewSerializer,
-                          TitleListSerializer, TitleSerializer,
-                          TokenSerializer, UserCreateSerializer,
-                          UserSerializer)
+                          TitleBulkSerializer, TitleListSerializer,
+                          TitleSerializer, TokenSerializer,
+                          UserCreateSerializer, UserSerializer)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(CachedResponseMixin, SparseFieldsMixin, ValuesListMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    version_resources = ('reviews',)
+    pagination_class = LimitOffsetOrKeysetPagination
     permission_classes = [IsAuthorOrAdminOrModerator, ]
 
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id'))
+        return self._title
+
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        if self.action == 'list':
+            self.get_title()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author', 'title')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(CachedResponseMixin, SparseFieldsMixin,
+                     ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    version_resources = ('comments',)
+    pagination_class = PageNumberOrKeysetPagination
     permission_classes = [IsAuthorOrAdminOrModerator]
 
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                title_id=self.kwargs.get('title_id'),
+                id=self.kwargs.get('review_id')
+            )
+        return self._review
+
     def get_queryset(self):
-        review = get_object_or_404(Review,
-                                   title__id=self.kwargs.get('title_id'),
-                                   id=self.kwargs.get('review_id'))
-        return review.comments.all()
+        if self.action == 'list':
+            self.get_review()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        ).select_related('author')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review,
-                                   title__id=self.kwargs.get('title_id'),
-                                   id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
 
 
-class CategoryViewSet(CreateObjectViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin,
+                      SlugBulkUpsertMixin, CreateObjectViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    bulk_serializer_class = CategoryBulkSerializer
+    version_resources = ('categories',)
     lookup_field = 'slug'
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filter_backends = (DjangoFilterBackend, TrigramSearchFilter)
     filterset_fields = ('name', 'slug')
     search_fields = ('name', )
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetOrKeysetPagination
+    keyset_ordering = ('name', 'id')
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class GenreViewSet(CreateObjectViewSet):
+class GenreViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   SlugBulkUpsertMixin, CreateObjectViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    bulk_serializer_class = GenreBulkSerializer
+    version_resources = ('genres',)
     lookup_field = 'slug'
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [TrigramSearchFilter]
     search_fields = ['name', ]
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetOrKeysetPagination
+    keyset_ordering = ('name', 'id')
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('name')
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   BulkUpsertMixin, SparseFieldsMixin, ValuesListMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').order_by('name')
     serializer_class = TitleListSerializer
-    pagination_class = LimitOffsetPagination
+    bulk_serializer_class = TitleBulkSerializer
+    version_resources = ('titles',)
+    pagination_class = LimitOffsetOrKeysetPagination
+    keyset_ordering = ('name', 'id')
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitleFilter
     filterset_fields = ['slug', ]
@@ -90,8 +132,74 @@ class TitleViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
             return TitleListSerializer
+        return TitleSerializer
+
+    def get_bulk_context(self, items):
+        context = super().get_bulk_context(items)
+        genre_slugs = {slug for item in items
+                       for slug in item.get('genre') or []
+                       if isinstance(slug, str)}
+        category_slugs = {item.get('category') for item in items
+                          if isinstance(item.get('category'), str)}
+        ids = [item['id'] for item in items
+               if isinstance(item.get('id'), int)]
+        context['genres'] = dict(Genre.objects.filter(
+            slug__in=genre_slugs).values_list('slug', 'id'))
+        context['categories'] = dict(Category.objects.filter(
+            slug__in=category_slugs).values_list('slug', 'id'))
+        context['existing'] = set(Title.objects.filter(
+            pk__in=ids).values_list('pk', flat=True))
+        return context
+
+    def bulk_save(self, items, context):
+        created, updated = [], []
+        for item in items:
+            item = dict(item)
+            genre_ids = item.pop('genre')
+            title = Title(category_id=item.pop('category'), **item)
+            (updated if title.pk else created).append((title, genre_ids))
+
+        connection = connections[router.db_for_write(Title)]
+        if connection.features.can_return_ids_from_bulk_insert:
+            Title.objects.bulk_create([title for title, _ in created])
         else:
-            return TitleSerializer
+            for title, _ in created:
+                title.save()
+        Title.objects.bulk_update(
+            [title for title, _ in updated],
+            ['name', 'year', 'description', 'category']
+        )
+        context['saved_pks'] = [title.pk for title, _ in created + updated]
+        # Удаление GenreTitle шлёт post_delete на каждую строку: жанры
+        # пересобираются один раз для всех записанных произведений.
+        with deferred_genre_refresh():
+            GenreTitle.objects.filter(
+                title_id__in=[title.pk for title, _ in updated]).delete()
+            GenreTitle.objects.bulk_create([
+                GenreTitle(title_id=title.pk, genre_id=genre_id)
+                for title, genre_ids in created + updated
+                for genre_id in genre_ids
+            ])
+            schedule_genre_refresh(context['saved_pks'])
+        return {
+            'created': [title.pk for title, _ in created],
+            'updated': [title.pk for title, _ in updated],
+        }
+
+    @action(detail=False, methods=['GET'], permission_classes=[IsAdmin])
+    def export(self, request):
+        export_format = request.query_params.get('type', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                data={'error': f'unknown export type {export_format}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serialize, content_type = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            serialize(iter_titles()), content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="titles.{export_format}"')
+        return response
 
 
 class UsersViewSet(ModelViewSet):
@@ -108,19 +216,19 @@ class UsersViewSet(ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def me(self, request):
-
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'PATCH':
             serializer = self.get_serializer(
-                request.user,
+                user,
                 data=request.data,
                 partial=True
             )
             serializer.is_valid(raise_exception=True)
             if 'role' in serializer.validated_data:
-                serializer.validated_data['role'] = request.user.role
+                serializer.validated_data['role'] = user.role
             self.perform_create(serializer)
         else:
-            serializer = self.get_serializer(request.user)
+            serializer = self.get_serializer(user)
 
         return Response(serializer.data)
 
@@ -138,31 +246,29 @@ def send_confirmation_code(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    users = User.objects.filter(username=username)
-    if users.exists():
+    # Повторная регистрация с теми же данными просто высылает новый код:
+    # одно чтение по индексу и никакой записи в таблицу пользователей.
+    try:
+        with transaction.atomic():
+            user, _ = User.objects.get_or_create(
+                username=username,
+                defaults={'email': email, 'password': make_password(None)}
+            )
+            if user.email != email:
+                raise IntegrityError
+            enqueue_email(
+                'Confirmation code for Yamdb',
+                'Here is your code: '
+                f'{make_confirmation_code(username, email)}',
+                email,
+                from_email=settings.ADMIN_EMAIL
+            )
+    except IntegrityError:
         return Response(
             data={'error': 'such a user already exists'},
             status=status.HTTP_400_BAD_REQUEST
         )
-
-    new_user = User.objects.create_user(username=username,
-                                        email=email)
-    new_user.save()
-
-    token = default_token_generator.make_token(new_user)
-    success = send_mail(
-        'Confirmation code for Yamdb',
-        f'Here is your code: {token}',
-        [f'{settings.ADMIN_EMAIL}'],
-        [email]
-    )
-    if success:
-        return Response(serializer.data, status=status.HTTP_200_OK)
-    new_user.delete()
-    return Response(
-        data={'error': 'Failed to send sent confirmation code'},
-        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-    )
+    return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -173,12 +279,12 @@ def get_token(request):
     confirmation_code = serializer.validated_data.get('confirmation_code')
     username = serializer.validated_data.get('username')
     user = get_object_or_404(User, username=username)
-    if not default_token_generator.check_token(user, confirmation_code):
+    if not check_confirmation_code(user, confirmation_code):
         return Response(
             data={'error': 'Not valid confirmation code'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    refresh = RefreshToken.for_user(user)
+    refresh = get_tokens_for_user(user)
     response_data = {
         'refresh': str(refresh),
         'access': str(refresh.access_token)
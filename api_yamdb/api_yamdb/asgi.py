@@ -1,7 +1,32 @@
 import os
 
-from django.core.asgi import get_asgi_application
-
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+try:
+    from django.core.asgi import get_asgi_application
+except ImportError:
+    # В Django 2.2 нет ASGI-обработчика: синхронное WSGI-приложение
+    # выполняется в пуле потоков, а соединения держит uvicorn.
+    from asgiref import wsgi
+    from asgiref.sync import sync_to_async
+    from django.core.wsgi import get_wsgi_application
+
+    class ThreadedWsgiToAsgiInstance(wsgi.WsgiToAsgiInstance):
+        # asgiref выполняет WSGI-приложение с thread_sensitive=True, то
+        # есть все запросы процесса по очереди в одном потоке. Django 2.2
+        # потокобезопасен (как под gthread), поэтому запросы идут
+        # параллельно в пуле потоков цикла событий.
+        run_wsgi_app = sync_to_async(
+            vars(wsgi.WsgiToAsgiInstance)['run_wsgi_app'].func,
+            thread_sensitive=False
+        )
+
+    class ThreadedWsgiToAsgi(wsgi.WsgiToAsgi):
+
+        async def __call__(self, scope, receive, send):
+            await ThreadedWsgiToAsgiInstance(self.wsgi_application)(
+                scope, receive, send)
+
+    application = ThreadedWsgiToAsgi(get_wsgi_application())
+else:
+    application = get_asgi_application()
@@ -0,0 +1,60 @@
+"""Настройки gunicorn для production.
+
+    gunicorn -c python:api_yamdb.gunicorn_conf
+
+Запускается из папки с manage.py. Режим выбирается переменной
+SERVER_MODE: `wsgi` (по умолчанию) — процессы с потоками gthread,
+`asgi` — процессы uvicorn. Остальные параметры задаются переменными
+GUNICORN_*; значения по умолчанию подобраны под контейнер из
+infra/docker-compose.yaml.
+"""
+import multiprocessing
+import os
+from distutils.util import strtobool
+
+SERVER_MODES = {
+    'wsgi': 'api_yamdb.wsgi:application',
+    'asgi': 'api_yamdb.asgi:application',
+}
+
+server_mode = os.getenv('SERVER_MODE', default='wsgi')
+if server_mode not in SERVER_MODES:
+    raise RuntimeError(
+        f'SERVER_MODE={server_mode!r}: допустимы {", ".join(SERVER_MODES)}')
+wsgi_app = SERVER_MODES[server_mode]
+
+bind = os.getenv('GUNICORN_BIND', default='0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS',
+                        default=multiprocessing.cpu_count() * 2 + 1))
+# Потоки нужны только синхронным процессам: uvicorn обслуживает
+# несколько соединений в одном потоке сам. Сам Django 2.2 в режиме asgi
+# выполняется через WsgiToAsgi с thread_sensitive=False (см. asgi.py):
+# запросы идут параллельно в пуле потоков цикла событий, а не по одному.
+threads = int(os.getenv('GUNICORN_THREADS',
+                        default=4 if server_mode == 'wsgi' else 1))
+if server_mode == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Перезапуск процесса после max_requests запросов ограничивает рост
+# памяти; разброс не даёт всем процессам перезапуститься одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = int(
+    os.getenv('GUNICORN_MAX_REQUESTS_JITTER', default=100))
+
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=5))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', default=30))
+preload_app = bool(strtobool(os.getenv('GUNICORN_PRELOAD', default='True')))
+
+# Пустое значение отключает журнал доступа.
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', default='-') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # При preload_app приложение импортируется до fork, и процессы не
+    # должны унаследовать открытые в мастере соединения с базой.
+    from django.db import connections
+    connections.close_all()
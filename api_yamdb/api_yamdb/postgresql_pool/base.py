@@ -0,0 +1,80 @@
+"""PostgreSQL с ограниченным пулом соединений внутри процесса.
+
+Подключается через ENGINE = 'api_yamdb.postgresql_pool'. Размер пула
+задаётся ключом POOL_SIZE в настройках базы, поэтому N процессов
+gunicorn держат не больше N * POOL_SIZE соединений. Закрытие соединения
+возвращает его в пул, так что CONN_MAX_AGE для этого бэкенда лучше
+оставлять равным нулю.
+"""
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+Database = base.Database
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class BoundedConnectionPool(pool.ThreadedConnectionPool):
+    """Пул, который ждёт освобождения соединения вместо ошибки.
+
+    Соединения открываются по требованию, а возвращённые остаются в пуле:
+    psycopg2 хранит не больше minconn свободных соединений, поэтому после
+    создания minconn поднимается до maxconn. Оборванное соединение пул
+    закрывает при возврате, и следующий getconn откроет новое.
+    """
+
+    def __init__(self, maxconn, timeout, **conn_params):
+        super().__init__(0, maxconn, **conn_params)
+        self.minconn = maxconn
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._timeout = timeout
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self._timeout):
+            raise Database.OperationalError(
+                'connection pool exhausted: no free connection '
+                f'in {self._timeout} seconds'
+            )
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            if self.alias not in _pools:
+                _pools[self.alias] = BoundedConnectionPool(
+                    self.settings_dict.get('POOL_SIZE') or 10,
+                    self.settings_dict.get('POOL_TIMEOUT', 30),
+                    **conn_params
+                )
+            return _pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool(conn_params).getconn()
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level)
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # Незавершённая транзакция откатывается самим пулом,
+                # а соединение в неизвестном состоянии закрывается.
+                _pools[self.alias].putconn(self.connection)
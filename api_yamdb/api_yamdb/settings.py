@@ -33,6 +33,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.CompressionMiddleware',
+    'api.middleware.QueryCountMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,10 +74,45 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Соединение живёт между запросами DB_CONN_MAX_AGE секунд; перед
+        # повторным использованием после простоя дольше
+        # DB_CONN_HEALTH_CHECK_IDLE секунд оно проверяется (см. api.signals).
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'CONN_HEALTH_CHECKS': strtobool(
+            os.getenv('DB_CONN_HEALTH_CHECKS', default='True')),
+        'CONN_HEALTH_CHECK_IDLE': int(
+            os.getenv('DB_CONN_HEALTH_CHECK_IDLE', default=10)),
+        # Используются только бэкендом api_yamdb.postgresql_pool.
+        'POOL_SIZE': int(os.getenv('DB_POOL_SIZE', default=10)),
+        'POOL_TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', default=30)),
     }
 }
 
+# Реплики для чтения: адреса через запятую в DB_REPLICA_HOSTS. Остальные
+# параметры подключения совпадают с основной базой. В тестах реплики
+# смотрят в тестовую основную базу.
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(','))):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+
+# round_robin или latency (реплика с наименьшей задержкой).
+REPLICA_STRATEGY = os.getenv('DB_REPLICA_STRATEGY', default='round_robin')
+REPLICA_PING_INTERVAL = int(
+    os.getenv('DB_REPLICA_PING_INTERVAL', default=5))
+# Сколько секунд после изменения ресурса его читают из основной базы:
+# ответ с отстающей реплики не должен закешироваться под новой версией.
+REPLICA_LAG_WINDOW = int(os.getenv('DB_REPLICA_LAG_WINDOW', default=5))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -113,7 +151,7 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -123,15 +161,107 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'PAGE_SIZE': 100
 }
 
+# Ответы короче этого порога отдаются без сжатия: выигрыш меньше затрат.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', default=1024))
+# Качество brotli для динамических ответов: 11 сжимает лучше, но в десятки
+# раз медленнее.
+COMPRESSION_BROTLI_QUALITY = int(
+    os.getenv('COMPRESSION_BROTLI_QUALITY', default=5))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10)
 }
 
+# При заданном REDIS_URL кеш общий для всех процессов gunicorn; без него
+# каждый процесс держит собственный кеш в памяти. Версии прав
+# пользователей лежат в отдельном кеше auth, чтобы их не вытесняли
+# закешированные ответы.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+        'auth': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('AUTH_REDIS_URL',
+                                  default=os.getenv('REDIS_URL')),
+            'KEY_PREFIX': 'auth',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'auth': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'auth',
+        },
+    }
+
+# Кеши, которые видят все процессы. Кеш ответов, ETag, версии прав в
+# токенах и сброс поискового индекса работают только с общим кешем, а
+# без него отключаются (см. api.caches).
+SHARED_CACHE_ALIASES = list(CACHES) if os.getenv('REDIS_URL') else []
+AUTH_CACHE_ALIAS = 'auth'
+
+# Сколько секунд хранить готовые ответы на анонимные GET-запросы. Ключ
+# содержит версии ресурсов, поэтому изменения видны сразу.
+RESPONSE_CACHE_TIMEOUT = int(
+    os.getenv('RESPONSE_CACHE_TIMEOUT', default=600))
+
+# Списки произведений, отзывов и комментариев строятся из .values() без
+# сериализатора DRF (см. api.rows); False возвращает обычный путь.
+VALUES_FAST_PATH = strtobool(os.getenv('VALUES_FAST_PATH', default='True'))
+
+# Сколько секунд хранить в кеше auth версию прав пользователя. Без записи
+# в кеше токен проверяется по БД, поэтому TTL влияет только на число
+# запросов, а не на то, как быстро отзываются права.
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', default=300))
+
+# Максимальное количество SQL-запросов на один вызов представления.
+QUERY_BUDGETS = {
+    'TitleViewSet.list': 5,
+    'TitleViewSet.retrieve': 3,
+    'GenreViewSet.list': 3,
+    'CategoryViewSet.list': 3,
+    'ReviewViewSet.list': 4,
+    'ReviewViewSet.create': 5,
+    'CommentViewSet.list': 4,
+    'CommentViewSet.create': 3,
+}
+QUERY_BUDGET_STRICT = strtobool(os.getenv('QUERY_BUDGET_STRICT', default='False'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': os.getenv('API_TIMING_LOG_LEVEL', default='INFO'),
+        },
+    },
+}
+
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 DEFAULT_FROM_EMAIL = f'admin@{DOMAIN_NAME}'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 ADMIN_EMAIL = 'admin@example.com'
+
+# Сколько секунд действует код подтверждения из письма.
+CONFIRMATION_CODE_MAX_AGE = int(
+    os.getenv('CONFIRMATION_CODE_MAX_AGE', default=24 * 60 * 60))
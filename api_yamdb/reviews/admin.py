@@ -22,7 +22,7 @@ class CommentAdmin(admin.ModelAdmin):
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
     list_display = (
-        'pk', 'name', 'year', 'description', 'category'
+        'pk', 'name', 'year', 'description', 'category', 'rating'
     )
     search_fields = ('name', 'slug', 'year')
     list_filter = ('name', 'year')
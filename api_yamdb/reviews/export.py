@@ -0,0 +1,51 @@
+import csv
+import io
+import itertools
+import json
+
+from .models import Title
+
+EXPORT_FIELDS = ('id', 'name', 'year', 'description', 'category', 'genre',
+                 'rating', 'review_count')
+
+
+def iter_titles(chunk_size=2000):
+    """Отдаёт произведения по одному, читая БД курсором по chunk_size."""
+    titles = Title.objects.order_by('pk').values(
+        'id', 'name', 'year', 'description', 'rating', 'review_count',
+        'category__slug', 'genres'
+    ).iterator(chunk_size=chunk_size)
+    for title in titles:
+        title['category'] = title.pop('category__slug')
+        title['genre'] = sorted(genre['slug'] for genre in title.pop('genres'))
+        yield title
+
+
+def iter_ndjson(titles):
+    for title in titles:
+        yield json.dumps(
+            {field: title[field] for field in EXPORT_FIELDS},
+            ensure_ascii=False
+        ) + '\n'
+
+
+def iter_csv(titles):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = (
+        [title[field] for field in EXPORT_FIELDS[:5]]
+        + [','.join(title['genre'])]
+        + [title[field] for field in EXPORT_FIELDS[6:]]
+        for title in titles
+    )
+    for row in itertools.chain([EXPORT_FIELDS], rows):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+EXPORT_FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+    'csv': (iter_csv, 'text/csv'),
+}
@@ -0,0 +1,78 @@
+import json
+
+from django.core.exceptions import EmptyResultSet
+from django.db import models
+from django.db.models import Lookup
+
+
+class GenreListField(models.Field):
+    """Список жанров произведения: `[{'name': ..., 'slug': ...}, ...]`.
+
+    В PostgreSQL хранится как jsonb (с GIN-индексом, см. миграции), в
+    остальных базах — как текст с JSON. Django 2.2 не умеет JSONField
+    вне PostgreSQL, поэтому поле сделано отдельно.
+    """
+
+    description = 'Список жанров в JSON'
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('default', list)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if kwargs.get('default') is list:
+            del kwargs['default']
+        if kwargs.get('editable') is False:
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+    def db_type(self, connection):
+        if connection.vendor == 'postgresql':
+            return 'jsonb'
+        return 'text'
+
+    def from_db_value(self, value, expression, connection):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+    def get_prep_value(self, value):
+        if value is None:
+            return value
+        return json.dumps(value, ensure_ascii=False)
+
+
+@GenreListField.register_lookup
+class SlugIn(Lookup):
+    """`genres__slug_in=[...]`: есть жанр с одним из переданных slug."""
+
+    lookup_name = 'slug_in'
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        slugs = list(self.rhs)
+        if not slugs:
+            raise EmptyResultSet
+        placeholders = ', '.join(['%s'] * len(slugs))
+        return (
+            f'EXISTS (SELECT 1 FROM json_each({lhs}) '
+            f"WHERE json_extract(json_each.value, '$.slug') "
+            f'IN ({placeholders}))',
+            [*lhs_params, *slugs]
+        )
+
+    def as_postgresql(self, compiler, connection):
+        # Каждое условие @> обслуживается GIN-индексом, а OR планировщик
+        # превращает в BitmapOr.
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        slugs = list(self.rhs)
+        if not slugs:
+            raise EmptyResultSet
+        conditions, params = [], []
+        for slug in slugs:
+            conditions.append(f'{lhs} @> %s::jsonb')
+            params += [*lhs_params, json.dumps([{'slug': slug}])]
+        return f'({" OR ".join(conditions)})', params
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from reviews.export import EXPORT_FORMATS, iter_titles
+
+
+class Command(BaseCommand):
+    help = 'Выгружает произведения с жанрами, категорией и рейтингом'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', dest='export_format', choices=EXPORT_FORMATS,
+            default='ndjson'
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки; по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        serialize, _ = EXPORT_FORMATS[options['export_format']]
+        lines = serialize(iter_titles(options['chunk_size']))
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            output.writelines(lines)
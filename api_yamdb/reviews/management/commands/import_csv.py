@@ -0,0 +1,200 @@
+import csv
+import io
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import (DEFAULT_DB_ALIAS, IntegrityError, connections,
+                       transaction)
+from django.utils import timezone
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.signals import bulk_saved
+from users.models import User
+
+# Файлы перечислены в порядке зависимостей по внешним ключам.
+CSV_FILES = (
+    ('users.csv', User, {'password': make_password(None)}),
+    ('category.csv', Category, {}),
+    ('genre.csv', Genre, {}),
+    ('titles.csv', Title, {}),
+    ('genre_title.csv', GenreTitle, {}),
+    ('review.csv', Review, {}),
+    ('comments.csv', Comment, {}),
+)
+
+# Маркер NULL для COPY: в CSV-режиме пустая строка в кавычках — это
+# пустая строка, а не NULL.
+COPY_NULL = r'\N'
+
+
+def format_copy_rows(rows):
+    """Записывает строки в формате COPY ... WITH (FORMAT csv, NULL '\\N').
+
+    Все значения, кроме None, берутся в кавычки, поэтому строка «\\N» из
+    файла не спутается с NULL.
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(
+            COPY_NULL if value is None
+            else '"{}"'.format(str(value).replace('"', '""'))
+            for value in row
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+class RowConverter:
+    """Превращает строку CSV в кортеж значений для всех колонок таблицы.
+
+    Колонки, которых нет в файле, заполняются значениями по умолчанию
+    полей модели, а auto_now_add-поля — текущим временем.
+    """
+
+    def __init__(self, model, header, connection, defaults=None):
+        self.connection = connection
+        self.defaults = defaults or {}
+        self.fields = [field for field in model._meta.concrete_fields]
+        self.sources = {}
+        for column in header:
+            try:
+                field = model._meta.get_field(column)
+            except Exception:
+                raise CommandError(
+                    f'{model._meta.label}: неизвестная колонка {column}')
+            self.sources[field.attname] = column
+        self.columns = [field.column for field in self.fields]
+
+    def convert(self, row):
+        values = []
+        for field in self.fields:
+            column = self.sources.get(field.attname)
+            if column is not None:
+                value = row[column]
+                if value == '' and field.null:
+                    value = None
+                value = field.to_python(value)
+                if value is not None:
+                    field.run_validators(value)
+            elif field.attname in self.defaults:
+                value = self.defaults[field.attname]
+            elif getattr(field, 'auto_now_add', False):
+                value = timezone.now()
+            else:
+                value = field.get_default()
+            values.append(field.get_db_prep_save(value, self.connection))
+        return values
+
+
+class Command(BaseCommand):
+    help = 'Загружает CSV-файлы из static/data в базу данных пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=os.path.join(settings.BASE_DIR, 'static',
+                                           'data'),
+            help='Каталог с CSV-файлами'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одной пачке'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Не использовать COPY даже в PostgreSQL'
+        )
+        parser.add_argument(
+            '--skip-invalid', action='store_true',
+            help='Пропускать некорректные строки вместо остановки'
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        use_copy = (connection.vendor == 'postgresql'
+                    and not options['no_copy'])
+        models = []
+        for filename, model, defaults in CSV_FILES:
+            path = os.path.join(options['path'], filename)
+            if not os.path.exists(path):
+                self.stdout.write(f'{filename}: файл не найден, пропущен')
+                continue
+            start = time.perf_counter()
+            try:
+                with transaction.atomic(using=options['database']):
+                    loaded = self.load_file(path, model, defaults,
+                                            connection, use_copy, options)
+            except IntegrityError as error:
+                raise CommandError(f'{filename}: {error}')
+            elapsed = time.perf_counter() - start
+            models.append(model)
+            self.stdout.write(
+                f'{filename}: {loaded} строк за {elapsed:.2f} с '
+                f'({loaded / elapsed if elapsed else loaded:.0f} строк/с)'
+            )
+        self.reset_sequences(connection, models)
+        Title.objects.using(options['database']).recalculate_ratings()
+        for model in models:
+            bulk_saved.send(sender=model)
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена'))
+
+    def load_file(self, path, model, defaults, connection, use_copy,
+                  options):
+        loaded = 0
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            reader = csv.DictReader(csv_file)
+            converter = RowConverter(model, reader.fieldnames, connection,
+                                     defaults)
+            batch = []
+            for row in reader:
+                try:
+                    batch.append(converter.convert(row))
+                except ValidationError as error:
+                    message = (f'{os.path.basename(path)}, строка '
+                               f'{reader.line_num}: {"; ".join(error)}')
+                    if not options['skip_invalid']:
+                        raise CommandError(message)
+                    self.stderr.write(message)
+                    continue
+                if len(batch) >= options['batch_size']:
+                    loaded += self.write_batch(model, converter, batch,
+                                               connection, use_copy)
+                    batch = []
+            if batch:
+                loaded += self.write_batch(model, converter, batch,
+                                           connection, use_copy)
+        return loaded
+
+    @staticmethod
+    def write_batch(model, converter, batch, connection, use_copy):
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(
+            connection.ops.quote_name(column) for column in converter.columns)
+        with connection.cursor() as cursor:
+            if use_copy:
+                cursor.copy_expert(
+                    f'COPY {table} ({columns}) FROM STDIN '
+                    f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                    format_copy_rows(batch)
+                )
+            else:
+                placeholders = ', '.join(['%s'] * len(converter.columns))
+                cursor.executemany(
+                    f'INSERT INTO {table} ({columns}) '
+                    f'VALUES ({placeholders})', batch
+                )
+        return len(batch)
+
+    @staticmethod
+    def reset_sequences(connection, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if not statements:
+            return
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from reviews.models import Title
+from reviews.signals import bulk_saved
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает количество отзывов и рейтинг произведений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'title_ids', nargs='*', type=int,
+            help='id произведений; по умолчанию пересчитываются все'
+        )
+
+    def handle(self, *args, **options):
+        titles = Title.objects.all()
+        if options['title_ids']:
+            titles = titles.filter(pk__in=options['title_ids'])
+        updated = titles.recalculate_ratings()
+        # update() не отправляет post_save: без сигнала версии ресурсов не
+        # изменятся, и кеш ответов и ETag останутся со старым рейтингом.
+        bulk_saved.send(sender=Title, pks=options['title_ids'] or None)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}'))
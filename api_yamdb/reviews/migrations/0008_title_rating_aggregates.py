@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-18 16:31
+
+from django.db import migrations, models
+from django.db.models import (Count, ExpressionWrapper, FloatField,
+                              IntegerField, OuterRef, Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    count = Subquery(reviews.annotate(value=Count('pk')).values('value'),
+                     output_field=IntegerField())
+    total = Subquery(reviews.annotate(value=Sum('score')).values('value'),
+                     output_field=IntegerField())
+    Title.objects.update(
+        review_count=Coalesce(count, 0),
+        score_sum=Coalesce(total, 0),
+        rating=ExpressionWrapper(
+            Cast(total, FloatField()) / NullIf(count, 0),
+            output_field=FloatField()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_auto_20210818_1024'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_rating_aggregates,
+                             migrations.RunPython.noop),
+    ]
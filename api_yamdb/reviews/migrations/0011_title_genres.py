@@ -0,0 +1,63 @@
+import django.db.models.deletion
+import reviews.fields
+from django.db import migrations, models
+
+
+def fill_genres(apps, schema_editor):
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle.objects.filter(
+        models.Q(title__isnull=True) | models.Q(genre__isnull=True)
+    ).delete()
+    genres = {}
+    rows = GenreTitle.objects.order_by(
+        'genre__name', 'genre__slug'
+    ).values_list('title_id', 'genre__name', 'genre__slug')
+    for title_id, name, slug in rows:
+        genres.setdefault(title_id, []).append({'name': name, 'slug': slug})
+    Title.objects.bulk_update(
+        [Title(pk=pk, genres=value) for pk, value in genres.items()],
+        ['genres'], batch_size=1000
+    )
+
+
+def create_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS reviews_title_genres_gin '
+        'ON reviews_title USING gin (genres jsonb_path_ops)'
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS reviews_title_genres_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='genres',
+            field=reviews.fields.GenreListField(verbose_name='Жанры (для чтения)'),
+        ),
+        migrations.RunPython(fill_genres, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='genretitle',
+            name='genre',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='genre_titles', to='reviews.Genre', verbose_name='жанр'),
+        ),
+        migrations.AlterField(
+            model_name='genretitle',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='genre_titles', to='reviews.Title', verbose_name='Произведения'),
+        ),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
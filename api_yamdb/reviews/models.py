@@ -1,9 +1,58 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     ValidationError)
 from django.db import models
+from django.db.models import (Count, ExpressionWrapper, F, FloatField,
+                              IntegerField, OuterRef, Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.utils import timezone
 from users.models import User
 
+from .fields import GenreListField
+
+# Произведения, жанры которых пересоберутся при выходе из
+# deferred_genre_refresh(); None — пересборка не отложена.
+_deferred_genre_titles = ContextVar('deferred_genre_titles', default=None)
+
+
+@contextmanager
+def deferred_genre_refresh():
+    """Пересобирает жанры затронутых произведений один раз в конце блока.
+
+    Сигналы GenreTitle внутри блока только запоминают произведения (см.
+    schedule_genre_refresh). Если блок завершился ошибкой, отложенная
+    пересборка отменяется вместе с самим откладыванием.
+    """
+    if _deferred_genre_titles.get() is not None:
+        yield
+        return
+    title_ids = set()
+    token = _deferred_genre_titles.set(title_ids)
+    try:
+        yield
+    finally:
+        _deferred_genre_titles.reset(token)
+    Title.objects.filter(pk__in=title_ids).refresh_genres()
+
+
+def schedule_genre_refresh(title_ids):
+    """Пересобирает жанры произведений сейчас или в конце отложенного блока."""
+    deferred = _deferred_genre_titles.get()
+    if deferred is None:
+        Title.objects.filter(pk__in=title_ids).refresh_genres()
+    else:
+        deferred.update(title_ids)
+
+
+class GenreQuerySet(models.QuerySet):
+
+    def delete(self):
+        # Каскад удаляет строки GenreTitle по одной с post_delete.
+        with deferred_genre_refresh():
+            return super().delete()
+
 
 class Genre(models.Model):
 
@@ -20,14 +69,23 @@ class Genre(models.Model):
                      'латиницу, цифры, дефисы и знаки подчёркивания'),
     )
 
+    objects = GenreQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], name='genre_name_id_idx'),
+        ]
         verbose_name = 'genre'
         verbose_name_plural = 'genres'
 
     def __str__(self):
         return self.name
 
+    def delete(self, *args, **kwargs):
+        with deferred_genre_refresh():
+            return super().delete(*args, **kwargs)
+
 
 class Category(models.Model):
 
@@ -46,6 +104,9 @@ class Category(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], name='category_name_id_idx'),
+        ]
         verbose_name = 'category'
         verbose_name_plural = 'categories'
 
@@ -58,13 +119,66 @@ def year_validator(value):
         raise ValidationError('Год не может быть больше текущего')
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def apply_review_delta(self, count_delta, score_delta):
+        """Сдвигает сохранённые агрегаты отзывов на заданную разницу."""
+        count = F('review_count') + count_delta
+        total = F('score_sum') + score_delta
+        return self.update(
+            review_count=count,
+            score_sum=total,
+            rating=ExpressionWrapper(
+                Cast(total, FloatField()) / NullIf(count, 0),
+                output_field=FloatField()
+            )
+        )
+
+    def refresh_genres(self, batch_size=1000):
+        """Пересобирает денормализованный список жанров произведений."""
+        title_ids = list(self.order_by().values_list('pk', flat=True))
+        for start in range(0, len(title_ids), batch_size):
+            genres = {pk: [] for pk in title_ids[start:start + batch_size]}
+            rows = GenreTitle.objects.filter(
+                title_id__in=genres
+            ).order_by('genre__name', 'genre__slug').values_list(
+                'title_id', 'genre__name', 'genre__slug')
+            for title_id, name, slug in rows:
+                genres[title_id].append({'name': name, 'slug': slug})
+            Title.objects.bulk_update(
+                [Title(pk=pk, genres=value) for pk, value in genres.items()],
+                ['genres']
+            )
+        return len(title_ids)
+
+    def recalculate_ratings(self):
+        """Пересчитывает агрегаты отзывов по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        count = Subquery(
+            reviews.annotate(value=Count('pk')).values('value'),
+            output_field=IntegerField()
+        )
+        total = Subquery(
+            reviews.annotate(value=Sum('score')).values('value'),
+            output_field=IntegerField()
+        )
+        return self.update(
+            review_count=Coalesce(count, 0),
+            score_sum=Coalesce(total, 0),
+            rating=ExpressionWrapper(
+                Cast(total, FloatField()) / NullIf(count, 0),
+                output_field=FloatField()
+            )
+        )
+
+
 class Title(models.Model):
 
     name = models.CharField(
         max_length=256,
         verbose_name='Название произведения',
-        help_text='Укажите название произведения',
-        db_index=True
+        help_text='Укажите название произведения'
     )
     year = models.IntegerField(
         verbose_name='Год выхода произведения',
@@ -94,11 +208,43 @@ class Title(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Категория',
         help_text='Укажите категорию',
-        db_index=True
+        # Покрывается составным индексом (category, name).
+        db_index=False
+    )
+
+    # Копия жанров из GenreTitle для чтения и фильтрации без JOIN.
+    # Обновляется сигналами (см. reviews.signals).
+    genres = GenreListField(verbose_name='Жанры (для чтения)')
+
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов',
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
     )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Рейтинг',
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ['name']
+        # Список произведений сортируется по name (и по name, id при
+        # постраничном выводе курсором) и фильтруется по category и year.
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+            models.Index(fields=['category', 'name'],
+                         name='title_category_name_idx'),
+            models.Index(fields=['year', 'name'], name='title_year_name_idx'),
+        ]
         verbose_name = 'title'
         verbose_name_plural = 'titles'
 
@@ -109,19 +255,18 @@ class Title(models.Model):
 class GenreTitle(models.Model):
     title = models.ForeignKey(
         Title,
-        null=True,
         on_delete=models.CASCADE,
         verbose_name='Произведения',
         related_name='genre_titles',
-        db_index=True
+        # Покрывается уникальным индексом (title, genre).
+        db_index=False
     )
     genre = models.ForeignKey(
         Genre,
-        null=True,
         on_delete=models.CASCADE,
         verbose_name='жанр',
         related_name='genre_titles',
-        db_index=True
+        db_index=False
     )
 
     class Meta:
@@ -130,6 +275,11 @@ class GenreTitle(models.Model):
                 fields=['title', 'genre'],
                 name="unique_genre_title")
         ]
+        # Фильтр по жанру выбирает title_id по genre_id только из индекса.
+        indexes = [
+            models.Index(fields=['genre', 'title'],
+                         name='genre_title_genre_title_idx'),
+        ]
 
         ordering = ['title']
         verbose_name = 'genre_title'
@@ -139,7 +289,7 @@ class GenreTitle(models.Model):
 class Review(models.Model):
     title = models.ForeignKey(
         Title, verbose_name='Название произведения',
-        on_delete=models.CASCADE, related_name='reviews', db_index=True)
+        on_delete=models.CASCADE, related_name='reviews', db_index=False)
     author = models.ForeignKey(
         User, verbose_name='Автор обзора',
         on_delete=models.CASCADE, related_name='reviews')
@@ -160,15 +310,30 @@ class Review(models.Model):
                 fields=['author', 'title'],
                 name='unique_reviewing')
         ]
+        # Отзывы произведения выводятся по pub_date, id. Поиск отзыва
+        # по (title, author) покрывает индекс ограничения unique_reviewing.
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+        ]
         ordering = ['pub_date']
         verbose_name = 'review'
         verbose_name_plural = 'reviews'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем сохранённую оценку, чтобы при её изменении сдвинуть
+        # агрегаты произведения на разницу, а не пересчитывать их заново.
+        if 'score' in field_names:
+            instance._loaded_score = values[field_names.index('score')]
+        return instance
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
         Review, verbose_name='Комментируемый обзор',
-        on_delete=models.CASCADE, related_name='comments', db_index=True)
+        on_delete=models.CASCADE, related_name='comments', db_index=False)
     text = models.TextField(verbose_name='Текст комментария')
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации', auto_now_add=True, db_index=True)
@@ -180,6 +345,10 @@ class Comment(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+        ]
         ordering = ['pub_date']
         verbose_name = 'comment'
         verbose_name_plural = 'comments'
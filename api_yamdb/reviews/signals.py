@@ -0,0 +1,77 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Genre, GenreTitle, Review, Title, schedule_genre_refresh
+
+# Отправляется после массовой записи (bulk_create/bulk_update, COPY),
+# при которой post_save не вызывается. sender — модель, pks — первичные
+# ключи записанных строк или None, если записана таблица целиком.
+bulk_saved = Signal()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        Title.objects.filter(pk=instance.title_id).apply_review_delta(
+            1, instance.score)
+    else:
+        old_score = getattr(instance, '_loaded_score', None)
+        if old_score is None:
+            Title.objects.filter(pk=instance.title_id).recalculate_ratings()
+        elif old_score != instance.score:
+            Title.objects.filter(pk=instance.title_id).apply_review_delta(
+                0, instance.score - old_score)
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    Title.objects.filter(pk=instance.title_id).apply_review_delta(
+        -1, -instance.score)
+
+
+# Жанры дублируются в Title.genres. add() у связи создаёт GenreTitle
+# через bulk_create без post_save, а remove(), clear() и каскадное удаление
+# жанра удаляют строки с post_delete для каждой. Массовые операции
+# откладывают пересборку (см. deferred_genre_refresh).
+@receiver(m2m_changed, sender=GenreTitle)
+def refresh_genres_on_add(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if action != 'post_add':
+        return
+    schedule_genre_refresh(pk_set if reverse else [instance.pk])
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def refresh_genres_on_genre_title(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_genre_refresh([instance.title_id])
+
+
+@receiver(post_save, sender=Genre)
+def refresh_genres_on_rename(sender, instance, created, raw=False,
+                             **kwargs):
+    if not created and not raw:
+        Title.objects.filter(
+            genre_titles__genre=instance).refresh_genres()
+
+
+# По каким строкам GenreTitle искать произведения, затронутые массовой
+# записью модели.
+BULK_SAVED_GENRE_TITLES = {
+    Genre: 'genre_id__in',
+    GenreTitle: 'pk__in',
+}
+
+
+@receiver(bulk_saved, sender=Genre)
+@receiver(bulk_saved, sender=GenreTitle)
+def refresh_genres_on_bulk_save(sender, pks=None, **kwargs):
+    titles = Title.objects.all()
+    if pks is not None:
+        titles = titles.filter(pk__in=GenreTitle.objects.filter(**{
+            BULK_SAVED_GENRE_TITLES[sender]: pks}).values('title_id'))
+    titles.refresh_genres()
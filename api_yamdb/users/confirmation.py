@@ -0,0 +1,24 @@
+"""Коды подтверждения без хранения в базе данных.
+
+Код — подписанные SECRET_KEY имя пользователя и почта с меткой времени.
+Проверка не требует отдельных запросов к БД: достаточно пользователя,
+которого и так загружает выдача токена. Код перестаёт действовать через
+CONFIRMATION_CODE_MAX_AGE секунд или после смены почты.
+"""
+from django.conf import settings
+from django.core import signing
+
+SALT = 'users.confirmation_code'
+
+
+def make_confirmation_code(username, email):
+    return signing.dumps([username, email], salt=SALT, compress=True)
+
+
+def check_confirmation_code(user, code):
+    try:
+        username, email = signing.loads(
+            code, salt=SALT, max_age=settings.CONFIRMATION_CODE_MAX_AGE)
+    except (signing.BadSignature, ValueError):
+        return False
+    return username == user.username and email == user.email
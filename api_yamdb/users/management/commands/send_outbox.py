@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from users.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих писем'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='сколько писем отправлять через одно SMTP-соединение'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='после стольких неудач письмо больше не отправляется'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='работать постоянно, опрашивая очередь'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='пауза в секундах, когда очередь пуста'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_batch(
+                options['batch_size'], options['max_attempts'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {total_sent}, с ошибкой: {total_failed}'))
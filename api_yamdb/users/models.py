@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -12,13 +13,6 @@ class User(AbstractUser):
         (MODERATOR, 'moderator'),
         (USER, 'user'),)
     email = models.EmailField(unique=True, verbose_name='Электронная почта')
-    confirmation_code = models.CharField(
-        blank=True,
-        editable=False,
-        null=True,
-        max_length=36,
-        verbose_name='Код доступа'
-    )
     role = models.CharField(max_length=20,
                             choices=CHOICES,
                             default='user',
@@ -26,12 +20,43 @@ class User(AbstractUser):
                             )
 
     bio = models.TextField(blank=True)
+    claims_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия данных в токенах'
+    )
+
+    # Поля, которые попадают в токен (см. api.authentication). При их
+    # изменении claims_version растёт, и выпущенные ранее токены больше
+    # не принимаются без проверки по БД. QuerySet.update() версию не
+    # меняет, поэтому права пользователей меняются только через save().
+    CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_superuser',
+                    'is_active')
 
     class Meta:
         ordering = ['-username']
         verbose_name = 'user'
         verbose_name_plural = 'users'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_claims = user.get_claims()
+        return user
+
+    def get_claims(self):
+        return tuple(self.__dict__.get(field) for field in self.CLAIM_FIELDS)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        loaded = getattr(self, '_loaded_claims', None)
+        if loaded is not None and loaded != self.get_claims():
+            self.claims_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = [*update_fields, 'claims_version']
+        super().save(*args, **kwargs)
+        self._loaded_claims = self.get_claims()
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN or self.is_staff
@@ -39,3 +64,36 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == self.MODERATOR
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (см. команду send_outbox)."""
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    recipient = models.EmailField(verbose_name='Получатель')
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Не отправлять раньше'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Отправлено'
+    )
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'outgoing email'
+        verbose_name_plural = 'outgoing emails'
+        indexes = [
+            models.Index(fields=['sent_at', 'send_after'],
+                         name='outbox_pending_idx'),
+        ]
@@ -0,0 +1,98 @@
+"""Очередь исходящих писем в базе данных.
+
+Запрос только сохраняет письмо в таблицу в своей транзакции, а
+отправляет его отдельный процесс `manage.py send_outbox`. Перед
+отправкой пачка писем «арендуется»: send_after сдвигается на LEASE, так
+что несколько обработчиков не отправят одно письмо дважды, а письма
+упавшего обработчика вернутся в очередь по истечении аренды.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+LEASE = timedelta(minutes=5)
+RETRY_DELAY = timedelta(seconds=30)
+
+
+def enqueue_email(subject, body, recipient, from_email=None):
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        recipient=recipient,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def claim_batch(batch_size, max_attempts):
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                send_after__lte=now,
+                attempts__lt=max_attempts,
+            )[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(send_after=now + LEASE)
+    return emails
+
+
+def defer(email, error, now):
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.send_after = now + RETRY_DELAY * 2 ** email.attempts
+
+
+def send_batch(batch_size=100, max_attempts=5):
+    """Отправляет пачку писем и возвращает (отправлено, с ошибкой).
+
+    После неудачи письмо откладывается с экспоненциально растущей
+    паузой; после max_attempts попыток оно остаётся в таблице с текстом
+    последней ошибки. Если не удалось подключиться к SMTP, неудачей
+    считается попытка для каждого письма пачки.
+    """
+    emails = claim_batch(batch_size, max_attempts)
+    if not emails:
+        return 0, 0
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        now = timezone.now()
+        for email in emails:
+            defer(email, error, now)
+        failed = len(emails)
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email,
+                    [email.recipient], connection=connection
+                )
+                now = timezone.now()
+                try:
+                    message.send()
+                except Exception as error:
+                    defer(email, error, now)
+                    failed += 1
+                else:
+                    email.sent_at = now
+                    sent += 1
+        finally:
+            # Письма уже отправлены: ошибка при закрытии соединения не
+            # должна помешать отметить их в базе.
+            try:
+                connection.close()
+            except Exception:
+                pass
+    OutgoingEmail.objects.bulk_update(
+        emails, ['attempts', 'last_error', 'send_after', 'sent_at'])
+    return sent, failed
@@ -0,0 +1,9 @@
+"""Нагрузочные замеры API.
+
+Модули запускаются из корня репозитория как `python -m benchmarks.<имя>`:
+
+- generate — наполняет базу синтетическим каталогом;
+- run — гоняет основные эндпоинты и печатает перцентили задержки,
+  пропускную способность и число запросов к БД в формате JSON;
+- signup_flow — сравнивает прежний и текущий поток регистрации.
+"""
@@ -0,0 +1,170 @@
+"""Синтетический каталог для нагрузочных замеров.
+
+    python -m benchmarks.generate --titles 10000 --reviews-per-title 20
+
+Пишет в базу из настроек DATABASES (SQLite или локальный PostgreSQL)
+пакетами через bulk_create, после чего пересчитывает рейтинги и
+сбрасывает последовательности первичных ключей.
+"""
+# isort:skip_file
+import argparse
+import json
+import random
+import time
+
+from benchmarks import django_env
+
+django_env.setup()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.core.management.color import no_style  # noqa: E402
+from django.db import connections, transaction  # noqa: E402
+from django.db.models import Max  # noqa: E402
+from reviews.models import (Category, Comment, Genre,  # noqa: E402
+                            GenreTitle, Review, Title)
+from reviews.signals import bulk_saved  # noqa: E402
+from users.models import User  # noqa: E402
+
+WORDS = (
+    'тёмный', 'город', 'ветер', 'история', 'последний', 'дом', 'море',
+    'звезда', 'тайна', 'песня', 'дорога', 'зима', 'сон', 'огонь', 'время',
+    'shadow', 'river', 'night', 'garden', 'machine', 'letter', 'empire',
+)
+MODELS = (User, Category, Genre, Title, GenreTitle, Review, Comment)
+
+
+def phrase(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def next_id(model, database):
+    return (model.objects.using(database).aggregate(
+        last=Max('pk'))['last'] or 0) + 1
+
+
+def create(model, objects, database, batch_size):
+    """Сохраняет объекты пачками по batch_size.
+
+    Пачку Django при необходимости делит сам: у SQLite есть ограничение
+    на количество строк в одном INSERT.
+    """
+    manager = model.objects.using(database)
+    for start in range(0, len(objects), batch_size):
+        manager.bulk_create(objects[start:start + batch_size])
+
+
+def generate(titles=1000, reviews_per_title=10, comments_per_review=2,
+             users=None, genres=30, categories=10, seed=0,
+             database='default', batch_size=2000):
+    """Создаёт каталог и возвращает количество записей каждой модели.
+
+    Первичные ключи назначаются заранее: на SQLite bulk_create в Django
+    2.2 не возвращает id, а они нужны для связанных записей.
+    """
+    rng = random.Random(seed)
+    users = users or max(reviews_per_title * 2, 50)
+    if reviews_per_title > users:
+        raise ValueError('отзывов на произведение не может быть больше, '
+                         'чем пользователей')
+    password = make_password(None)
+    counts = {}
+    with transaction.atomic(using=database):
+        start = next_id(User, database)
+        user_ids = list(range(start, start + users))
+        create(User, [
+            User(pk=pk, username=f'bench_{pk}',
+                 email=f'bench_{pk}@bench.fake', password=password)
+            for pk in user_ids
+        ], database, batch_size)
+
+        start = next_id(Category, database)
+        category_ids = list(range(start, start + categories))
+        create(Category, [
+            Category(pk=pk, name=phrase(rng, 2), slug=f'bench-category-{pk}')
+            for pk in category_ids
+        ], database, batch_size)
+
+        start = next_id(Genre, database)
+        genre_ids = list(range(start, start + genres))
+        create(Genre, [
+            Genre(pk=pk, name=phrase(rng, 1), slug=f'bench-genre-{pk}')
+            for pk in genre_ids
+        ], database, batch_size)
+
+        start = next_id(Title, database)
+        title_ids = list(range(start, start + titles))
+        create(Title, [
+            Title(pk=pk, name=phrase(rng, rng.randint(1, 4)),
+                  year=rng.randint(1900, 2021),
+                  description=phrase(rng, 12),
+                  category_id=rng.choice(category_ids))
+            for pk in title_ids
+        ], database, batch_size)
+        create(GenreTitle, [
+            GenreTitle(title_id=title_id, genre_id=genre_id)
+            for title_id in title_ids
+            for genre_id in rng.sample(genre_ids, min(3, genres))
+        ], database, batch_size)
+
+        review_id = next_id(Review, database)
+        reviews = []
+        for title_id in title_ids:
+            for author_id in rng.sample(user_ids, reviews_per_title):
+                reviews.append(Review(
+                    pk=review_id, title_id=title_id, author_id=author_id,
+                    text=phrase(rng, 20), score=rng.randint(1, 10)))
+                review_id += 1
+        create(Review, reviews, database, batch_size)
+        create(Comment, [
+            Comment(review_id=review.pk, author_id=rng.choice(user_ids),
+                    text=phrase(rng, 8))
+            for review in reviews
+            for _ in range(comments_per_review)
+        ], database, batch_size)
+
+        connection = connections[database]
+        statements = connection.ops.sequence_reset_sql(no_style(), MODELS)
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        Title.objects.using(database).filter(
+            pk__in=title_ids).recalculate_ratings()
+
+    for model in MODELS:
+        bulk_saved.send(sender=model)
+        counts[model._meta.model_name] = model.objects.using(
+            database).count()
+    return counts
+
+
+def add_size_arguments(parser):
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--reviews-per-title', type=int, default=10)
+    parser.add_argument('--comments-per-review', type=int, default=2)
+    parser.add_argument('--users', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_size_arguments(parser)
+    parser.add_argument('--database', default='default')
+    options = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(
+        titles=options.titles,
+        reviews_per_title=options.reviews_per_title,
+        comments_per_review=options.comments_per_review,
+        users=options.users,
+        seed=options.seed,
+        database=options.database,
+    )
+    print(json.dumps({
+        'counts': counts,
+        'seconds': round(time.perf_counter() - start, 2),
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""Замер задержки основных эндпоинтов API.
+
+    python -m benchmarks.run --titles 2000 --requests 300 --output out.json
+    python -m benchmarks.run --base-url http://127.0.0.1:8000 --concurrency 8
+
+Без --base-url запросы идут через тестовый клиент Django во временную
+тестовую базу, которую скрипт наполняет сам (см. benchmarks.generate).
+С --base-url нагружается запущенный сервер, а данные должны быть
+заранее созданы командой `python -m benchmarks.generate` в той же базе.
+
+Для каждого сценария печатаются p50/p95/p99 и среднее время в
+миллисекундах, пропускная способность и число запросов к БД (из
+заголовка Server-Timing), чтобы результаты разных коммитов можно было
+сравнивать.
+"""
+# isort:skip_file
+import argparse
+import json
+import math
+import random
+import re
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import django_env
+
+django_env.setup()
+
+from benchmarks.generate import add_size_arguments, generate  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from reviews.models import Category, Genre, Review, Title  # noqa: E402
+from users.confirmation import make_confirmation_code  # noqa: E402
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class ClientDriver:
+    """Запросы через тестовый клиент Django в том же процессе."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None):
+        if method == 'POST':
+            response = self.client.post(
+                path, data=json.dumps(data), content_type='application/json')
+        else:
+            response = self.client.get(path)
+        return response.status_code, response.get('Server-Timing', '')
+
+
+class HttpDriver:
+    """Запросы по HTTP к запущенному серверу."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, data=None):
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=body, method=method,
+            headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status, headers = response.status, response.headers
+        except urllib.error.HTTPError as error:
+            status, headers = error.code, error.headers
+        return status, headers.get('Server-Timing', '')
+
+
+def collect_targets(rng):
+    """Выбирает из базы объекты, к которым будут обращаться сценарии."""
+    reviews = list(Review.objects.values_list('title_id', 'pk')[:500])
+    if not reviews:
+        raise SystemExit('в базе нет отзывов: запустите benchmarks.generate')
+    return {
+        'reviews': reviews,
+        'genres': list(Genre.objects.values_list('slug', flat=True)),
+        'categories': list(Category.objects.values_list('slug', flat=True)),
+        'title_count': Title.objects.count(),
+        'rng': rng,
+    }
+
+
+def title_list(targets, number):
+    offset = targets['rng'].randrange(max(targets['title_count'] - 20, 1))
+    return 'GET', f'/api/v1/titles/?limit=20&offset={offset}', None
+
+
+def title_filtered(targets, number):
+    rng = targets['rng']
+    return 'GET', (f'/api/v1/titles/?genre={rng.choice(targets["genres"])}'
+                   f'&category={rng.choice(targets["categories"])}'), None
+
+
+def title_search(targets, number):
+    word = targets['rng'].choice(('город', 'мор', 'shadow', 'тайн', 'ночь'))
+    return 'GET', f'/api/v1/titles/?name={word}', None
+
+
+def title_detail(targets, number):
+    title_id, _ = targets['rng'].choice(targets['reviews'])
+    return 'GET', f'/api/v1/titles/{title_id}/', None
+
+
+def review_list(targets, number):
+    title_id, _ = targets['rng'].choice(targets['reviews'])
+    return 'GET', f'/api/v1/titles/{title_id}/reviews/', None
+
+
+def comment_list(targets, number):
+    title_id, review_id = targets['rng'].choice(targets['reviews'])
+    return 'GET', (f'/api/v1/titles/{title_id}/reviews/{review_id}'
+                   '/comments/'), None
+
+
+def signup(targets, number):
+    return 'POST', '/api/v1/auth/signup/', {
+        'username': f'signup_{targets["run_id"]}_{number}',
+        'email': f'signup_{targets["run_id"]}_{number}@bench.fake',
+    }
+
+
+def token(targets, number):
+    username = f'signup_{targets["run_id"]}_{number}'
+    return 'POST', '/api/v1/auth/token/', {
+        'username': username,
+        'confirmation_code': make_confirmation_code(
+            username, f'{username}@bench.fake'),
+    }
+
+
+# Сценарий token использует пользователей, созданных сценарием signup.
+SCENARIOS = {
+    'title_list': title_list,
+    'title_filtered': title_filtered,
+    'title_search': title_search,
+    'title_detail': title_detail,
+    'review_list': review_list,
+    'comment_list': comment_list,
+    'signup': signup,
+    'token': token,
+}
+
+
+def percentile(values, rank):
+    return values[max(math.ceil(rank / 100 * len(values)) - 1, 0)]
+
+
+def summarize(timings, queries, errors, elapsed):
+    timings = sorted(timings)
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'p50_ms': round(percentile(timings, 50) * 1000, 2),
+        'p95_ms': round(percentile(timings, 95) * 1000, 2),
+        'p99_ms': round(percentile(timings, 99) * 1000, 2),
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 2),
+        'throughput_rps': round(len(timings) / elapsed, 1),
+        'queries_mean': (round(sum(queries) / len(queries), 2)
+                         if queries else None),
+        'queries_max': max(queries) if queries else None,
+    }
+
+
+def run_scenario(make_driver, scenario, targets, requests, concurrency,
+                 warmup):
+    drivers = [make_driver() for _ in range(concurrency)]
+    for number in range(warmup):
+        drivers[0].request(*scenario(targets, -number - 1))
+
+    def call(number):
+        method, path, data = scenario(targets, number)
+        start = time.perf_counter()
+        status, server_timing = drivers[number % concurrency].request(
+            method, path, data)
+        duration = time.perf_counter() - start
+        match = QUERIES.search(server_timing)
+        return duration, int(match.group(1)) if match else None, status
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        # Тестовый клиент должен работать в потоке, открывшем тестовую базу.
+        results = [call(number) for number in range(requests)]
+    else:
+        with ThreadPoolExecutor(concurrency) as executor:
+            results = list(executor.map(call, range(requests)))
+    elapsed = time.perf_counter() - start
+    return summarize(
+        [duration for duration, _, _ in results],
+        [count for _, count, _ in results if count is not None],
+        sum(status >= 400 for _, _, status in results),
+        elapsed,
+    )
+
+
+def run(make_driver, scenarios, requests=200, concurrency=1, warmup=10,
+        seed=0):
+    targets = collect_targets(random.Random(seed))
+    targets['run_id'] = f'{int(time.time())}_{seed}'
+    return {
+        name: run_scenario(make_driver, SCENARIOS[name], targets, requests,
+                           concurrency, warmup)
+        for name in scenarios
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=django_env.ROOT,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_size_arguments(parser)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='запросов на сценарий')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='параллельных клиентов (только с --base-url)')
+    parser.add_argument('--scenario', action='append',
+                        choices=list(SCENARIOS),
+                        help='сценарий; по умолчанию все')
+    parser.add_argument('--base-url')
+    parser.add_argument('--response-cache', action='store_true',
+                        help='не отключать кеш ответов анонимам')
+    parser.add_argument('--output', help='файл для JSON-результата')
+    options = parser.parse_args()
+    if options.concurrency > 1 and not options.base_url:
+        parser.error('--concurrency работает только с --base-url')
+
+    meta = {
+        'commit': current_commit(),
+        'vendor': connection.vendor,
+        'requests': options.requests,
+        'concurrency': options.concurrency,
+    }
+    scenarios = options.scenario or list(SCENARIOS)
+    if options.base_url:
+        meta['mode'] = options.base_url
+        results = run(lambda: HttpDriver(options.base_url), scenarios,
+                      options.requests, options.concurrency,
+                      options.warmup, options.seed)
+    else:
+        meta['mode'] = 'in-process'
+        setup_test_environment()
+        if not options.response_cache:
+            settings.RESPONSE_CACHE_TIMEOUT = 0
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0)
+        try:
+            meta['counts'] = generate(
+                titles=options.titles,
+                reviews_per_title=options.reviews_per_title,
+                comments_per_review=options.comments_per_review,
+                users=options.users,
+                seed=options.seed,
+            )
+            results = run(ClientDriver, scenarios, options.requests, 1,
+                          options.warmup, options.seed)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    output = json.dumps({'meta': meta, 'scenarios': results},
+                        ensure_ascii=False, indent=2)
+    if options.output:
+        with open(options.output, 'w') as file:
+            file.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
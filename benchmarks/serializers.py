@@ -0,0 +1,122 @@
+"""Стоимость одного элемента списка: сериализатор DRF против .values().
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.serializers --titles 500 --page-size 100
+
+Скрипт создаёт временную тестовую базу, наполняет её generate и для
+страниц списков произведений, отзывов и комментариев замеряет процессорное
+время выборки и построения данных ответа на один элемент двумя способами:
+объекты модели с ModelSerializer и строки .values() с RowMapper (см.
+api.rows). Маппер строится один раз, как и в представлениях. Заодно
+проверяется, что JSON обоих способов совпадает байт в байт.
+"""
+# isort:skip_file
+import argparse
+import json
+import time
+
+from benchmarks import django_env
+
+django_env.setup()
+
+from api.rows import get_row_mapper  # noqa: E402
+from api.serializers import (CommentSerializer,  # noqa: E402
+                             ReviewSerializer, TitleListSerializer)
+from benchmarks.generate import add_size_arguments, generate  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from reviews.models import Comment, Review, Title  # noqa: E402
+
+
+def cases():
+    review = Review.objects.annotate(
+        comment_count=Count('comments')).order_by('-comment_count').first()
+    title_id = Review.objects.values('title_id').annotate(
+        reviews=Count('id')).order_by('-reviews')[0]['title_id']
+    return {
+        'titles': (
+            TitleListSerializer,
+            Title.objects.select_related('category').order_by('name'),
+        ),
+        'reviews': (
+            ReviewSerializer,
+            Review.objects.filter(title_id=title_id).select_related(
+                'author', 'title').order_by('pub_date', 'id'),
+        ),
+        'comments': (
+            CommentSerializer,
+            Comment.objects.filter(review=review).select_related(
+                'author').order_by('pub_date', 'id'),
+        ),
+    }
+
+
+def per_item(operation, repeat):
+    """Процессорное время одного элемента в микросекундах и результат."""
+    items = 0
+    start = time.process_time()
+    for _ in range(repeat):
+        result = operation()
+        items += len(result)
+    return round((time.process_time() - start) / items * 1e6, 2), result
+
+
+def measure(serializer_class, queryset, repeat):
+    mapper = get_row_mapper(serializer_class())
+    fetch_objects, objects = per_item(lambda: list(queryset.all()), repeat)
+    fetch_rows, rows = per_item(
+        lambda: list(queryset.values(*mapper.columns)), repeat)
+    serialize, serialized = per_item(
+        lambda: serializer_class(objects, many=True).data, repeat)
+    build, built = per_item(lambda: [mapper(row) for row in rows], repeat)
+
+    render = JSONRenderer().render
+    assert render(serialized) == render(built), (
+        f'{serializer_class.__name__}: ответы различаются')
+    return {
+        'items': len(rows),
+        'serializer': {'fetch_us': fetch_objects, 'represent_us': serialize,
+                       'total_us': round(fetch_objects + serialize, 2)},
+        'values': {'fetch_us': fetch_rows, 'represent_us': build,
+                   'total_us': round(fetch_rows + build, 2)},
+        'speedup': round((fetch_objects + serialize)
+                         / (fetch_rows + build), 1),
+    }
+
+
+def run(page_size=100, repeat=20):
+    return {
+        name: measure(serializer_class, queryset[:page_size], repeat)
+        for name, (serializer_class, queryset) in cases().items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_size_arguments(parser)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    options = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        generate(
+            titles=options.titles,
+            reviews_per_title=options.reviews_per_title,
+            comments_per_review=options.comments_per_review,
+            users=options.users,
+            seed=options.seed,
+        )
+        result = run(options.page_size, options.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    print(json.dumps({'vendor': connection.vendor,
+                      'page_size': options.page_size,
+                      'cases': result}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
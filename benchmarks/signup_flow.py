@@ -0,0 +1,118 @@
+"""Сравнение прежнего и текущего потока регистрации и выдачи токена.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.signup_flow --iterations 200
+
+Скрипт создаёт временную тестовую базу по настройкам DATABASES, поэтому
+работает и с SQLite, и с локальным PostgreSQL. Результат — JSON с
+количеством запросов к БД и средним временем одной операции.
+"""
+# isort:skip_file
+import argparse
+import json
+import time
+
+from benchmarks import django_env
+
+django_env.setup()
+
+from api.serializers import UserCreateSerializer  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.contrib.auth.tokens import default_token_generator  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework import serializers  # noqa: E402
+from users.confirmation import (check_confirmation_code,  # noqa: E402
+                                make_confirmation_code)
+from users.models import User  # noqa: E402
+
+
+class LegacyUserCreateSerializer(serializers.ModelSerializer):
+    class Meta:
+        fields = ('email', 'username')
+        model = User
+
+
+def legacy_signup(data):
+    serializer = LegacyUserCreateSerializer(data=data)
+    if not serializer.is_valid():
+        return None
+    if User.objects.filter(username=data['username']).exists():
+        return None
+    user = User.objects.create_user(**serializer.validated_data)
+    user.save()
+    return default_token_generator.make_token(user)
+
+
+def legacy_token(username, code):
+    user = User.objects.get(username=username)
+    return default_token_generator.check_token(user, code)
+
+
+def current_signup(data):
+    serializer = UserCreateSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    user, _ = User.objects.get_or_create(
+        username=data['username'],
+        defaults={'email': data['email'], 'password': make_password(None)}
+    )
+    return make_confirmation_code(user.username, user.email)
+
+
+def current_token(username, code):
+    user = User.objects.get(username=username)
+    return check_confirmation_code(user, code)
+
+
+def measure(operation, arguments):
+    """Возвращает статистику и результаты вызовов operation."""
+    queries = 0
+    results = []
+    start = time.perf_counter()
+    for args in arguments:
+        with CaptureQueriesContext(connection) as context:
+            results.append(operation(*args))
+        queries += len(context.captured_queries)
+    elapsed = time.perf_counter() - start
+    return {
+        'queries_per_op': round(queries / len(arguments), 2),
+        'us_per_op': round(elapsed / len(arguments) * 1e6, 1),
+    }, results
+
+
+def run_flow(prefix, signup, token, iterations):
+    data = [{'username': f'{prefix}{number}',
+             'email': f'{prefix}{number}@bench.fake'}
+            for number in range(iterations)]
+    first, codes = measure(signup, [(item,) for item in data])
+    repeat, _ = measure(signup, [(item,) for item in data])
+    issue, valid = measure(token, [(item['username'], code)
+                                   for item, code in zip(data, codes)])
+    assert all(valid), 'коды подтверждения должны проходить проверку'
+    return {'signup': first, 'repeat_signup': repeat, 'token': issue}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    options = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        result = {
+            'iterations': options.iterations,
+            'vendor': connection.vendor,
+            'legacy': run_flow('legacy', legacy_signup, legacy_token,
+                               options.iterations),
+            'current': run_flow('current', current_signup, current_token,
+                                options.iterations),
+        }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
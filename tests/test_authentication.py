@@ -0,0 +1,88 @@
+import pytest
+from api.authentication import get_tokens_for_user
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from users.models import User
+
+
+@pytest.fixture
+def admin_client():
+    cache.clear()
+    user = User.objects.create(username='admin_user', email='admin@yamdb.fake',
+                               role=User.ADMIN)
+    # Версия прав попадает в кеш при создании; проверяем выпуск токена.
+    caches['auth'].clear()
+    token = get_tokens_for_user(user).access_token
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+    client.user = user
+    return client
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def test_no_user_query(self, admin_client):
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get('/api/v1/users/')
+
+        assert response.status_code == 200
+        assert not any(
+            'FROM "users_user" WHERE "users_user"."id"' in query['sql']
+            for query in context.captured_queries
+        ), 'Пользователь должен браться из токена без запроса к БД'
+
+    def test_role_change_invalidates_claims(self, admin_client):
+        admin_client.user.role = User.USER
+        admin_client.user.save()
+
+        response = admin_client.get('/api/v1/users/')
+
+        assert response.status_code == 403, (
+            'После смены роли права должны проверяться по новой роли'
+        )
+
+    def test_deleted_user(self, admin_client):
+        admin_client.user.delete()
+
+        response = admin_client.get('/api/v1/users/me/')
+
+        assert response.status_code == 401
+
+    def test_profile_change_keeps_claims(self, admin_client):
+        admin_client.user.bio = 'Новое описание'
+        admin_client.user.save()
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get('/api/v1/users/')
+
+        assert response.status_code == 200
+        assert admin_client.user.claims_version == 0
+        assert not any('"users_user"."id" =' in query['sql']
+                       for query in context.captured_queries)
+
+    def test_evicted_version_checked_in_db(self, admin_client):
+        admin_client.user.role = User.USER
+        admin_client.user.save()
+        # Кеш ответов вытесняет записи, но версии прав в отдельном кеше;
+        # даже если и они пропали, токен проверяется по БД.
+        for number in range(400):
+            cache.set(f'flood:{number}', number)
+        caches['auth'].clear()
+
+        response = admin_client.get('/api/v1/users/')
+
+        assert response.status_code == 403
+
+    def test_without_shared_cache(self, admin_client, settings):
+        settings.SHARED_CACHE_ALIASES = []
+        User.objects.filter(pk=admin_client.user.pk).update(role=User.USER)
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get('/api/v1/users/')
+
+        assert response.status_code == 403, (
+            'Без общего кеша права должны проверяться по БД')
+        assert any('"users_user"."id" =' in query['sql']
+                   for query in context.captured_queries)
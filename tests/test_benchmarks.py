@@ -0,0 +1,33 @@
+import pytest
+
+from benchmarks.generate import generate
+from benchmarks.run import SCENARIOS, ClientDriver, run
+from benchmarks.serializers import run as run_serializers
+
+
+@pytest.mark.django_db
+def test_benchmark_smoke(settings):
+    settings.QUERY_BUDGET_STRICT = False
+    counts = generate(titles=5, reviews_per_title=2, comments_per_review=1,
+                      users=3, genres=3, categories=2)
+    assert counts['title'] == 5
+    assert counts['review'] == 10
+    assert counts['comment'] == 10
+
+    results = run(ClientDriver, list(SCENARIOS), requests=3, warmup=0)
+
+    for name, stats in results.items():
+        assert stats['errors'] == 0, f'Сценарий {name} завершился ошибкой'
+        assert stats['p50_ms'] <= stats['p99_ms']
+        assert stats['queries_mean'] is not None
+
+
+@pytest.mark.django_db
+def test_serializer_benchmark_smoke():
+    generate(titles=3, reviews_per_title=2, comments_per_review=2,
+             users=3, genres=2, categories=2)
+
+    results = run_serializers(page_size=10, repeat=1)
+
+    assert {name: stats['items'] for name, stats in results.items()} == {
+        'titles': 3, 'reviews': 2, 'comments': 2}
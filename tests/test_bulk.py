@@ -0,0 +1,134 @@
+import pytest
+from api.authentication import get_tokens_for_user
+from api.mixins import BulkUpsertMixin
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework import viewsets
+from reviews.models import Category, Genre, Title
+from users.models import User
+
+
+@pytest.fixture
+def admin_client():
+    admin = User.objects.create(username='admin_user',
+                                email='admin@yamdb.fake', role=User.ADMIN)
+    cache.clear()
+    token = get_tokens_for_user(admin).access_token
+    return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+def post(client, url, data):
+    return client.post(url, data=data, content_type='application/json')
+
+
+@pytest.mark.django_db
+class TestBulkUpsert:
+
+    def test_genres_upsert(self, admin_client):
+        Genre.objects.create(name='Драма', slug='drama')
+        response = post(admin_client, '/api/v1/genres/bulk/', [
+            {'name': 'Драмы', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ])
+
+        assert response.status_code == 201
+        assert response.json() == {'created': ['comedy'],
+                                   'updated': ['drama']}
+        assert Genre.objects.get(slug='drama').name == 'Драмы'
+
+    def test_titles_create_constant_queries(self, admin_client):
+        Category.objects.create(name='Фильм', slug='movie')
+        for slug in ('drama', 'comedy', 'thriller'):
+            Genre.objects.create(name=slug, slug=slug)
+        data = [
+            {'name': f'Произведение {number}', 'year': 2000,
+             'description': 'Описание', 'category': 'movie',
+             'genre': ['drama', 'comedy']}
+            for number in range(20)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = post(admin_client, '/api/v1/titles/bulk/', data)
+
+        assert response.status_code == 201
+        assert Title.objects.count() == 20
+        assert Title.objects.filter(genre__slug='comedy').count() == 20
+        if connection.features.can_return_ids_from_bulk_insert:
+            assert len(context.captured_queries) <= 10
+
+    @pytest.mark.parametrize('count', [2, 20])
+    def test_titles_update_constant_queries(self, admin_client, count):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genres = [Genre.objects.create(name=slug, slug=slug)
+                  for slug in ('drama', 'comedy')]
+        titles = []
+        for number in range(count):
+            title = Title.objects.create(name=f'Произведение {number}',
+                                         year=2000, category=category)
+            title.genre.add(*genres)
+            titles.append(title)
+        data = [
+            {'id': title.id, 'name': 'Новое', 'year': 2001,
+             'description': 'Описание', 'category': 'movie',
+             'genre': ['comedy']}
+            for title in titles
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = post(admin_client, '/api/v1/titles/bulk/', data)
+
+        assert response.status_code == 201
+        assert len(context.captured_queries) <= 12, (
+            'Обновление пачки не должно пересобирать жанры по одному '
+            'произведению'
+        )
+        assert all(genres == [{'name': 'comedy', 'slug': 'comedy'}]
+                   for genres in Title.objects.values_list('genres',
+                                                           flat=True))
+
+    def test_titles_update(self, admin_client):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Старое', year=2000,
+                                     description='Описание',
+                                     category=category)
+        response = post(admin_client, '/api/v1/titles/bulk/', [
+            {'id': title.id, 'name': 'Новое', 'year': 2001,
+             'description': 'Описание', 'category': 'movie',
+             'genre': ['drama']},
+        ])
+
+        assert response.json() == {'created': [], 'updated': [title.id]}
+        title.refresh_from_db()
+        assert title.name == 'Новое'
+        assert list(title.genre.values_list('slug', flat=True)) == ['drama']
+
+    def test_errors_per_item(self, admin_client):
+        Category.objects.create(name='Фильм', slug='movie')
+        response = post(admin_client, '/api/v1/titles/bulk/', [
+            {'name': 'Хорошее', 'year': 2000, 'description': 'Описание',
+             'category': 'movie', 'genre': []},
+            {'name': 'Плохое', 'year': 2000, 'description': 'Описание',
+             'category': 'unknown', 'genre': ['unknown']},
+        ])
+
+        assert response.status_code == 400
+        errors = response.json()['errors']
+        assert [error['index'] for error in errors] == [1]
+        assert set(errors[0]['errors']) == {'category', 'genre'}
+        assert not Title.objects.exists(), (
+            'При ошибках ни один элемент не должен записываться'
+        )
+
+    def test_admin_only(self, client):
+        response = post(client, '/api/v1/genres/bulk/', [])
+
+        assert response.status_code == 401
+
+
+def test_bulk_save_required():
+    class GenreViewSet(BulkUpsertMixin, viewsets.GenericViewSet):
+        queryset = Genre.objects.all()
+
+    with pytest.raises(TypeError, match='bulk_save'):
+        GenreViewSet()
@@ -0,0 +1,131 @@
+import datetime
+import decimal
+import gzip
+import json
+from collections import OrderedDict
+
+import brotli
+import pytest
+from api import renderers
+from api.middleware import CompressionMiddleware, parse_accept_encoding
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Category, Title
+
+DATA = OrderedDict([
+    ('pub_date', datetime.datetime(2022, 3, 1, 12, 30, 5, 123456,
+                                   tzinfo=timezone.utc)),
+    ('day', datetime.date(2022, 3, 1)),
+    ('rating', decimal.Decimal('7.50')),
+    ('score', 7.5),
+    ('text', 'Отзыв со\u2028строками\u2029и "кавычками"'),
+    ('message', gettext_lazy('Not found.')),
+    ('items', [1, None, True, {'nested': ()}]),
+    (3, 'ключ-число'),
+])
+
+
+class TestFastJSONRenderer:
+
+    def test_same_bytes_as_stdlib(self):
+        assert renderers.FastJSONRenderer().render(DATA) == (
+            JSONRenderer().render(DATA))
+
+    def test_line_separators_escaped(self):
+        content = renderers.FastJSONRenderer().render(DATA)
+
+        assert b'\\u2028' in content and b'\\u2029' in content
+        assert '\u2028'.encode() not in content
+        assert '\u2029'.encode() not in content
+
+    def test_falls_back_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+
+        assert renderers.FastJSONRenderer().render(DATA) == (
+            JSONRenderer().render(DATA))
+
+    def test_indent_uses_stdlib(self):
+        media_type = 'application/json; indent=4'
+
+        assert renderers.FastJSONRenderer().render(DATA, media_type) == (
+            JSONRenderer().render(DATA, media_type))
+
+
+def respond(response, accept_encoding=None):
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+BODY = json.dumps([{'text': f'Отзыв {number}'}
+                   for number in range(100)]).encode()
+
+
+class TestCompressionMiddleware:
+
+    def test_parse_accept_encoding(self):
+        assert parse_accept_encoding('gzip, br;q=0.5, *;q=0') == {
+            'gzip': 1.0, 'br': 0.5, '*': 0.0}
+
+    @pytest.mark.parametrize('accept_encoding, coding', [
+        ('gzip, deflate, br', 'br'),
+        ('gzip', 'gzip'),
+        ('br;q=0.5, gzip', 'gzip'),
+        ('br;q=0, *', 'gzip'),
+        ('identity', None),
+        ('', None),
+    ])
+    def test_negotiation(self, accept_encoding, coding):
+        response = respond(HttpResponse(BODY), accept_encoding)
+
+        assert response.get('Content-Encoding') == coding
+        assert response['Vary'] == 'Accept-Encoding'
+        if coding is None:
+            assert response.content == BODY
+            return
+        decompress = {'br': brotli.decompress, 'gzip': gzip.decompress}
+        assert decompress[coding](response.content) == BODY
+        assert response['Content-Length'] == str(len(response.content))
+
+    def test_small_response_untouched(self, settings):
+        settings.COMPRESSION_MIN_SIZE = len(BODY) + 1
+
+        response = respond(HttpResponse(BODY), 'gzip')
+
+        assert not response.has_header('Content-Encoding')
+        assert response.content == BODY
+
+    def test_etag_becomes_weak(self):
+        response = HttpResponse(BODY)
+        response['ETag'] = '"abc"'
+
+        assert respond(response, 'gzip')['ETag'] == 'W/"abc"'
+
+    @pytest.mark.parametrize('coding, decompress', [
+        ('br', brotli.decompress),
+        ('gzip', gzip.decompress),
+    ])
+    def test_streaming(self, coding, decompress):
+        chunks = [BODY[:1000], BODY[1000:]]
+
+        response = respond(StreamingHttpResponse(chunks), coding)
+
+        assert response['Content-Encoding'] == coding
+        assert decompress(b''.join(response.streaming_content)) == BODY
+
+
+@pytest.mark.django_db
+def test_title_list_compressed(client):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    for number in range(30):
+        Title.objects.create(name=f'Произведение {number}', year=2000,
+                             category=category)
+
+    plain = client.get('/api/v1/titles/')
+    compressed = client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='br')
+
+    assert compressed['Content-Encoding'] == 'br'
+    assert len(compressed.content) < len(plain.content)
+    assert brotli.decompress(compressed.content) == plain.content
@@ -0,0 +1,67 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', ['/api/v1/genres/', '/api/v1/titles/',
+                                     '/api/v1/categories/'])
+    def test_not_modified_without_queries(self, client, url):
+        response = client.get(url)
+        assert 'ETag' in response and 'Last-Modified' in response, (
+            f'Проверьте, что GET `{url}` возвращает ETag и Last-Modified'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        assert response.status_code == 304
+        assert not context.captured_queries, (
+            'Ответ 304 должен отдаваться без запросов к БД'
+        )
+
+    def test_change_invalidates_etag(self, client):
+        etag = client.get('/api/v1/titles/')['ETag']
+        category = Category.objects.create(name='Фильм', slug='movie')
+        Title.objects.create(name='Произведение', year=2000,
+                             description='Описание', category=category)
+
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+
+    def test_genre_change_invalidates_titles(self, client):
+        etag = client.get('/api/v1/titles/')['ETag']
+        Genre.objects.create(name='Драма', slug='drama')
+
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+
+    def test_no_etag_without_shared_cache(self, client, settings):
+        settings.SHARED_CACHE_ALIASES = []
+
+        response = client.get('/api/v1/genres/', HTTP_IF_NONE_MATCH='*')
+
+        assert response.status_code == 200
+        assert 'ETag' not in response and 'Last-Modified' not in response
+
+    def test_recalculate_ratings_invalidates_etag(self, client):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title = Title.objects.create(name='Произведение', year=2000,
+                                     description='Описание',
+                                     category=category)
+        Title.objects.filter(pk=title.pk).update(rating=9, review_count=1)
+        etag = client.get('/api/v1/titles/')['ETag']
+
+        call_command('recalculate_ratings', stdout=io.StringIO())
+
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['results'][0]['rating'] is None
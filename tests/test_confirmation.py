@@ -0,0 +1,74 @@
+import re
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from users.confirmation import make_confirmation_code
+from users.models import User
+
+SIGNUP = {'username': 'new_user', 'email': 'new@yamdb.fake'}
+
+
+def get_code():
+    call_command('send_outbox')
+    return re.search(r'code: (\S+)', mail.outbox[-1].body).group(1)
+
+
+@pytest.mark.django_db
+class TestConfirmationCode:
+
+    def test_repeated_signup_does_not_write_users(self, client):
+        client.post('/api/v1/auth/signup/', data=SIGNUP)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/auth/signup/', data=SIGNUP)
+
+        assert response.status_code == 200
+        user_writes = [
+            query['sql'] for query in context.captured_queries
+            if 'users_user' in query['sql']
+            and not query['sql'].startswith('SELECT')
+        ]
+        assert not user_writes, (
+            'Повторная регистрация не должна писать в таблицу пользователей'
+        )
+        assert User.objects.count() == 1
+
+    def test_signup_conflicts(self, client):
+        client.post('/api/v1/auth/signup/', data=SIGNUP)
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'new_user', 'email': 'other@yamdb.fake'})
+        assert response.status_code == 400
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'other_user', 'email': 'new@yamdb.fake'})
+        assert response.status_code == 400
+
+    def test_token_costs_one_query(self, client):
+        client.post('/api/v1/auth/signup/', data=SIGNUP)
+        code = get_code()
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/auth/token/', data={
+                'username': 'new_user', 'confirmation_code': code})
+
+        assert response.status_code == 200
+        assert 'access' in response.json()
+        assert len(context.captured_queries) == 1
+
+    def test_invalid_codes(self, client, settings):
+        client.post('/api/v1/auth/signup/', data=SIGNUP)
+        forged = make_confirmation_code('new_user', 'new@yamdb.fake')[:-1]
+        other = make_confirmation_code('new_user', 'other@yamdb.fake')
+
+        for code in (forged, other, 'garbage'):
+            response = client.post('/api/v1/auth/token/', data={
+                'username': 'new_user', 'confirmation_code': code})
+            assert response.status_code == 400
+
+        settings.CONFIRMATION_CODE_MAX_AGE = -1
+        response = client.post('/api/v1/auth/token/', data={
+            'username': 'new_user', 'confirmation_code': get_code()})
+        assert response.status_code == 400, 'Просроченный код не действует'
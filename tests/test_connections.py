@@ -0,0 +1,112 @@
+import psycopg2
+import pytest
+from api import signals
+from psycopg2 import extensions
+
+from api_yamdb.postgresql_pool.base import BoundedConnectionPool
+
+
+class FakeConnection:
+    def __init__(self, *args, **kwargs):
+        self.closed = False
+        self.info = type('Info', (), {
+            'transaction_status': extensions.TRANSACTION_STATUS_IDLE})()
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def connection_pool(monkeypatch):
+    monkeypatch.setattr(psycopg2, 'connect', FakeConnection)
+    return BoundedConnectionPool(2, 0, dbname='yamdb')
+
+
+class TestBoundedConnectionPool:
+
+    def test_returned_connection_reused(self, connection_pool):
+        first = connection_pool.getconn()
+        second = connection_pool.getconn()
+        connection_pool.putconn(first)
+
+        assert connection_pool.getconn() is first
+        assert not first.closed
+        assert second is not first
+
+    def test_exhausted(self, connection_pool):
+        connection_pool.getconn()
+        connection_pool.getconn()
+
+        with pytest.raises(psycopg2.OperationalError, match='exhausted'):
+            connection_pool.getconn()
+
+    def test_broken_connection_replaced(self, connection_pool):
+        broken = connection_pool.getconn()
+        connection_pool.getconn()
+        broken.info.transaction_status = (
+            extensions.TRANSACTION_STATUS_UNKNOWN)
+
+        connection_pool.putconn(broken)
+        fresh = connection_pool.getconn()
+
+        assert broken.closed
+        assert fresh is not broken
+
+
+class DatabaseWrapper:
+    settings_dict = {'CONN_HEALTH_CHECKS': True,
+                     'CONN_HEALTH_CHECK_IDLE': 10}
+    in_atomic_block = False
+
+    def __init__(self, usable):
+        self.connection = object()
+        self.usable = usable
+        self.checks = 0
+
+    def is_usable(self):
+        self.checks += 1
+        return self.usable
+
+    def close(self):
+        self.connection = None
+
+
+@pytest.fixture
+def wrappers(monkeypatch):
+    wrappers = [DatabaseWrapper(usable=False), DatabaseWrapper(usable=True)]
+    monkeypatch.setattr(signals.connections, 'all', lambda: wrappers)
+    return wrappers
+
+
+class TestHealthChecks:
+
+    def test_idle_broken_connection_closed(self, wrappers):
+        broken, usable = wrappers
+
+        signals.check_connections_health()
+
+        assert broken.connection is None
+        assert usable.connection is not None
+
+    def test_recent_connection_not_checked(self, wrappers, monkeypatch):
+        signals.mark_connections_idle()
+        monkeypatch.setattr(signals.time, 'monotonic',
+                            lambda: wrappers[0].idle_since + 5)
+
+        signals.check_connections_health()
+
+        assert [wrapper.checks for wrapper in wrappers] == [0, 0]
+        assert wrappers[0].connection is not None
+
+    def test_checked_after_idle_threshold(self, wrappers, monkeypatch):
+        signals.mark_connections_idle()
+        monkeypatch.setattr(signals.time, 'monotonic',
+                            lambda: wrappers[0].idle_since + 10)
+
+        signals.check_connections_health()
+
+        assert [wrapper.checks for wrapper in wrappers] == [1, 1]
+        assert wrappers[0].connection is None
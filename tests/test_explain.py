@@ -0,0 +1,25 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Category, Comment, Review, Title
+from users.models import User
+
+
+@pytest.mark.django_db
+def test_explain_lists_uses_composite_indexes():
+    author = User.objects.create(username='author', email='a@yamdb.fake')
+    category = Category.objects.create(name='Фильм', slug='movie')
+    title = Title.objects.create(name='Произведение', year=2000,
+                                 description='Описание', category=category)
+    review = Review.objects.create(title=title, author=author, text='Текст',
+                                   score=5)
+    Comment.objects.create(review=review, author=author, text='Текст')
+    out = StringIO()
+
+    call_command('explain_lists', stdout=out)
+
+    output = out.getvalue()
+    assert 'review_title_pub_date_idx' in output
+    assert 'comment_review_pub_date_idx' in output
+    assert 'titles?category=movie' in output
@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+
+import pytest
+from api.authentication import get_tokens_for_user
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client
+from users.models import User
+
+
+@pytest.fixture
+def admin_client():
+    call_command('import_csv')
+    admin = User.objects.get(username='capt_obvious')
+    cache.clear()
+    token = get_tokens_for_user(admin).access_token
+    return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+@pytest.mark.django_db
+class TestTitleExport:
+
+    def test_export_ndjson(self, admin_client):
+        response = admin_client.get('/api/v1/titles/export/')
+
+        assert response.status_code == 200
+        assert response.streaming, 'Выгрузка должна отдаваться потоком'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        titles = [json.loads(line) for line in lines]
+        assert len(titles) == 32
+        assert titles[0]['genre'] == ['drama']
+        assert titles[0]['category'] == 'movie'
+
+    def test_export_csv(self, admin_client):
+        response = admin_client.get('/api/v1/titles/export/?type=csv')
+
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == 32
+
+    def test_export_admin_only(self, client):
+        response = client.get('/api/v1/titles/export/')
+
+        assert response.status_code == 401
+
+    def test_export_command_stdout(self):
+        call_command('import_csv')
+        output = io.StringIO()
+
+        call_command('export_titles', export_format='csv', stdout=output)
+
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        assert len(rows) == 32
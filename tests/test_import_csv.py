@@ -0,0 +1,33 @@
+import pytest
+from django.core.management import call_command
+from reviews.management.commands.import_csv import format_copy_rows
+from reviews.models import Comment, GenreTitle, Review, Title
+
+
+@pytest.mark.django_db
+class TestImportCSV:
+
+    def test_import_static_data(self):
+        call_command('import_csv', batch_size=10)
+
+        assert Title.objects.count() == 32
+        assert GenreTitle.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        title = Title.objects.get(pk=1)
+        assert title.review_count == title.reviews.count(), (
+            'После загрузки должны быть пересчитаны рейтинги произведений'
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Дата публикации должна браться из CSV'
+        )
+
+
+def test_copy_rows_keep_nulls():
+    rows = [[1, None, '', 'Текст "в кавычках"', True],
+            [2, 'строка\nс переносом', '\\N', None, False]]
+
+    assert format_copy_rows(rows).read() == (
+        '"1",\\N,"","Текст ""в кавычках""","True"\n'
+        '"2","строка\nс переносом","\\N",\\N,"False"\n'
+    )
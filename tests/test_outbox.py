@@ -0,0 +1,96 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from users.management.commands import send_outbox
+from users.models import OutgoingEmail, User
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def signup(self, client):
+        return client.post('/api/v1/auth/signup/', data={
+            'username': 'new_user', 'email': 'new@yamdb.fake'
+        })
+
+    def test_signup_queues_email(self, client):
+        response = self.signup(client)
+
+        assert response.status_code == 200
+        assert not mail.outbox, (
+            'Письмо должно отправляться не из запроса, а из очереди'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'new@yamdb.fake'
+        assert User.objects.filter(username='new_user').exists()
+
+    def test_send_outbox(self, client):
+        self.signup(client)
+
+        call_command('send_outbox')
+
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['new@yamdb.fake']
+        assert OutgoingEmail.objects.get().sent_at is not None
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1, 'Письмо не должно уходить дважды'
+
+    def test_failed_delivery_is_retried_later(self, client, monkeypatch):
+        self.signup(client)
+
+        def fail(*args, **kwargs):
+            raise ConnectionRefusedError('SMTP недоступен')
+
+        monkeypatch.setattr('django.core.mail.EmailMessage.send', fail)
+        call_command('send_outbox')
+
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.send_after > timezone.now()
+
+    def test_connection_failure_defers_batch(self, client, settings):
+        self.signup(client)
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'other_user', 'email': 'other@yamdb.fake'
+        })
+        settings.EMAIL_BACKEND = 'tests.test_outbox.UnreachableBackend'
+
+        call_command('send_outbox')
+
+        for email in OutgoingEmail.objects.all():
+            assert email.sent_at is None
+            assert email.attempts == 1
+            assert 'SMTP' in email.last_error
+            assert email.send_after > timezone.now()
+
+    def test_loop_survives_connection_failure(self, client, settings,
+                                              monkeypatch):
+        self.signup(client)
+        settings.EMAIL_BACKEND = 'tests.test_outbox.UnreachableBackend'
+        sleeps = []
+
+        def sleep(interval):
+            sleeps.append(interval)
+            if len(sleeps) == 2:
+                raise KeyboardInterrupt
+
+        monkeypatch.setattr(send_outbox.time, 'sleep', sleep)
+        with pytest.raises(KeyboardInterrupt):
+            call_command('send_outbox', loop=True, interval=0.5)
+
+        assert sleeps == [0.5, 0.5]
+        assert OutgoingEmail.objects.get().attempts == 1
+
+
+class UnreachableBackend(BaseEmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('send_messages без соединения')
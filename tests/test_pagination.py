@@ -0,0 +1,53 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    title = Title.objects.create(name='Произведение', year=2000,
+                                 description='Описание', category=category)
+    for number in range(7):
+        author = User.objects.create(username=f'user{number}',
+                                     email=f'user{number}@yamdb.fake')
+        Review.objects.create(title=title, author=author, text='Отзыв',
+                              score=number + 1)
+    return title
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_walk_all_pages(self, client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=3'
+        ids = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == 200
+            assert 'count' not in response.json(), (
+                'Постраничный вывод по курсору не должен считать COUNT'
+            )
+            assert not any('COUNT' in query['sql']
+                           for query in context.captured_queries)
+            ids.extend(review['id'] for review in response.json()['results'])
+            url = response.json()['next']
+
+        assert ids == list(
+            title.reviews.order_by('pub_date', 'id').values_list(
+                'id', flat=True)
+        )
+
+    def test_offset_pagination_kept(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/?limit=3')
+
+        assert response.json()['count'] == 7
+
+    def test_invalid_cursor(self, client, title):
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=broken')
+
+        assert response.status_code == 404
@@ -0,0 +1,29 @@
+import pytest
+from api.middleware import QueryBudgetError
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    def test_server_timing_header(self, client):
+        response = client.get('/api/v1/genres/')
+
+        assert response.status_code == 200
+        assert 'Server-Timing' in response, (
+            'Проверьте, что ответ содержит заголовок Server-Timing'
+        )
+        assert 'db;dur=' in response['Server-Timing']
+
+    def test_budget_exceeded(self, client, settings):
+        settings.QUERY_BUDGETS = {'GenreViewSet.list': 0}
+
+        with pytest.raises(QueryBudgetError):
+            client.get('/api/v1/genres/')
+
+    def test_budget_not_strict(self, client, settings):
+        settings.QUERY_BUDGETS = {'GenreViewSet.list': 0}
+        settings.QUERY_BUDGET_STRICT = False
+
+        response = client.get('/api/v1/genres/')
+
+        assert response.status_code == 200
@@ -0,0 +1,85 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg
+from reviews.models import Category, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    return Title.objects.create(name='Произведение', year=2000,
+                                category=category)
+
+
+@pytest.fixture
+def users():
+    return [User.objects.create(username=f'user{number}',
+                                email=f'user{number}@yamdb.fake')
+            for number in range(3)]
+
+
+def assert_rating_matches(title):
+    title.refresh_from_db()
+    expected = Title.objects.filter(pk=title.pk).aggregate(
+        value=Avg('reviews__score'))['value']
+    if expected is None:
+        assert title.rating is None
+    else:
+        assert title.rating == pytest.approx(expected)
+    assert title.review_count == title.reviews.count()
+
+
+@pytest.mark.django_db
+class TestRatings:
+
+    def test_create_update_delete(self, title, users):
+        reviews = [
+            Review.objects.create(title=title, author=user, text='Отзыв',
+                                  score=score)
+            for user, score in zip(users, (4, 7, 10))
+        ]
+        assert_rating_matches(title)
+        assert title.rating == pytest.approx(7)
+
+        reviews[0].score = 1
+        reviews[0].save()
+        assert_rating_matches(title)
+        assert title.rating == pytest.approx(6)
+
+        fetched = Review.objects.get(pk=reviews[1].pk)
+        fetched.score = 10
+        fetched.save()
+        assert_rating_matches(title)
+
+        reviews[2].delete()
+        assert_rating_matches(title)
+
+    def test_last_review_deleted(self, title, users):
+        review = Review.objects.create(title=title, author=users[0],
+                                       text='Отзыв', score=8)
+        assert_rating_matches(title)
+
+        review.delete()
+
+        title.refresh_from_db()
+        assert title.rating is None
+        assert title.review_count == 0
+        assert title.score_sum == 0
+
+    def test_recalculate_command_repairs(self, title, users):
+        for user, score in zip(users, (2, 5)):
+            Review.objects.create(title=title, author=user, text='Отзыв',
+                                  score=score)
+        Title.objects.filter(pk=title.pk).update(
+            rating=1, review_count=10, score_sum=3)
+
+        output = io.StringIO()
+        call_command('recalculate_ratings', title.pk, stdout=output)
+
+        assert 'Пересчитано произведений: 1' in output.getvalue()
+        assert_rating_matches(title)
+        assert title.rating == pytest.approx(3.5)
+        assert title.score_sum == 7
@@ -0,0 +1,89 @@
+import pytest
+from api.authentication import get_tokens_for_user
+from api.db_router import primary_reads, replica_reads
+from django.core.management import call_command
+from django.db import connections, router
+from django.test import Client
+from reviews.models import Category, Title
+from users.models import User
+
+REPLICAS = ['replica_a', 'replica_b']
+
+
+@pytest.fixture
+def replicas(tmp_path, settings, django_db_blocker):
+    """Две реплики в отдельных файлах SQLite рядом с основной базой."""
+    for alias in REPLICAS:
+        connections.databases[alias] = {
+            **connections.databases['default'],
+            'NAME': str(tmp_path / f'{alias}.sqlite3'),
+        }
+        with django_db_blocker.unblock():
+            call_command('migrate', database=alias, verbosity=0)
+    settings.DATABASE_REPLICAS = REPLICAS
+    settings.RESPONSE_CACHE_TIMEOUT = 0
+    settings.REPLICA_LAG_WINDOW = 0
+    yield REPLICAS
+    for alias in REPLICAS:
+        connections[alias].close()
+        del connections[alias]
+        del connections.databases[alias]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouter:
+
+    def test_get_reads_from_replicas_round_robin(self, client, replicas):
+        for alias in replicas:
+            Category.objects.using(alias).create(name=alias, slug=alias)
+
+        names = [
+            client.get('/api/v1/categories/').json()['results'][0]['name']
+            for _ in range(4)
+        ]
+
+        assert names == replicas * 2, (
+            'GET-запросы должны читать с реплик по очереди'
+        )
+
+    def test_write_goes_to_primary(self, replicas):
+        admin = User.objects.create(username='admin_user',
+                                    email='admin@yamdb.fake', role=User.ADMIN)
+        token = get_tokens_for_user(admin).access_token
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        response = client.post('/api/v1/categories/',
+                               data={'name': 'Фильм', 'slug': 'movie'})
+
+        assert response.status_code == 201
+        assert Category.objects.using('default').filter(
+            slug='movie').exists()
+        for alias in replicas:
+            assert not Category.objects.using(alias).exists()
+
+    def test_read_after_write_stays_on_primary(self, replicas):
+        with replica_reads():
+            assert router.db_for_read(Title) in replicas
+            router.db_for_write(Title)
+            assert router.db_for_read(Title) == 'default'
+
+        assert router.db_for_read(Title) == 'default', (
+            'Вне безопасных запросов чтение должно идти в основную базу'
+        )
+
+    def test_primary_reads_block(self, replicas):
+        with replica_reads():
+            with primary_reads():
+                assert router.db_for_read(Title) == 'default'
+            assert router.db_for_read(Title) in replicas
+
+    def test_recent_change_read_from_primary(self, client, settings,
+                                             replicas):
+        settings.REPLICA_LAG_WINDOW = 60
+        # Реплика ещё не получила новую категорию.
+        Category.objects.create(name='Фильм', slug='movie')
+
+        response = client.get('/api/v1/categories/')
+
+        assert response.json()['results'] == [
+            {'name': 'Фильм', 'slug': 'movie'}]
@@ -0,0 +1,88 @@
+import io
+
+import pytest
+from api.authentication import get_tokens_for_user
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    @pytest.mark.parametrize('url', ['/api/v1/genres/', '/api/v1/titles/',
+                                     '/api/v1/categories/'])
+    def test_anonymous_hit_without_queries(self, client, url):
+        first = client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            second = client.get(url)
+
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert not context.captured_queries, (
+            f'Повторный анонимный GET `{url}` должен отдаваться из кеша'
+        )
+
+    def test_write_invalidates_cached_page(self, client):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title = Title.objects.create(name='Произведение', year=2000,
+                                     description='Описание',
+                                     category=category)
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{title.pk}/')
+
+        Genre.objects.create(name='Драма', slug='drama')
+        title.genre.add(Genre.objects.get(slug='drama'))
+
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = User.objects.create(username='reader', email='r@yamdb.fake')
+        token = get_tokens_for_user(user).access_token
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+        client.get('/api/v1/genres/')
+
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/genres/')
+
+        assert context.captured_queries
+
+    def test_no_cache_without_shared_cache(self, client, settings):
+        settings.SHARED_CACHE_ALIASES = []
+        client.get('/api/v1/genres/')
+        # Изменение в другом процессе: версии в этом кеше не поднимаются.
+        Genre.objects.bulk_create([Genre(name='Драма', slug='drama')])
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/genres/')
+
+        assert context.captured_queries
+        assert response.json()['count'] == 1
+
+    def test_recalculate_ratings_invalidates_cached_page(self, client):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title = Title.objects.create(name='Произведение', year=2000,
+                                     description='Описание',
+                                     category=category)
+        Review.objects.create(title=title, text='Отзыв', score=4,
+                              author=User.objects.create(
+                                  username='reader', email='r@yamdb.fake'))
+        Title.objects.filter(pk=title.pk).update(rating=9)
+        stale = client.get('/api/v1/titles/').json()
+
+        call_command('recalculate_ratings', stdout=io.StringIO())
+
+        response = client.get('/api/v1/titles/')
+        assert stale['results'][0]['rating'] == 9
+        assert response.json()['results'][0]['rating'] == 4
@@ -0,0 +1,130 @@
+import pytest
+from api.authentication import get_tokens_for_user
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Comment, Review, Title
+from users.models import User
+
+
+def create_users(count):
+    return [
+        User.objects.create(username=f'user{number}',
+                            email=f'user{number}@yamdb.fake')
+        for number in range(count)
+    ]
+
+
+def make_client(user):
+    token = get_tokens_for_user(user).access_token
+    return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    return Title.objects.create(name='Произведение', year=2000,
+                                description='Описание', category=category)
+
+
+@pytest.fixture
+def review(title):
+    users = create_users(10)
+    cache.clear()
+    for user in users:
+        Review.objects.create(title=title, author=user, text='Отзыв',
+                              score=5)
+    return Review.objects.first()
+
+
+def count_queries(client, method, url, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestReviewQueries:
+
+    def test_review_list(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        response, queries = count_queries(client, 'get', url)
+
+        assert response.status_code == 200
+        assert queries <= 3, (
+            f'GET `{url}` должен выполнять не больше 3 запросов к БД, '
+            f'выполнено {queries}'
+        )
+
+    def test_review_list_missing_title(self, client):
+        response = client.get('/api/v1/titles/404/reviews/')
+
+        assert response.status_code == 404
+
+    def test_review_create(self, title):
+        author = create_users(1)[0]
+        cache.clear()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        data = {'text': 'Отзыв', 'score': 7}
+        response, queries = count_queries(make_client(author), 'post', url,
+                                          data=data)
+
+        assert response.status_code == 201
+        assert queries <= 4, (
+            f'POST `{url}` должен выполнять не больше 4 запросов к БД, '
+            f'выполнено {queries}'
+        )
+        response = make_client(author).post(url, data=data)
+        assert response.status_code == 400
+
+    def test_comment_list(self, client, review):
+        for author in User.objects.all():
+            Comment.objects.create(review=review, author=author,
+                                   text='Комментарий')
+        url = (f'/api/v1/titles/{review.title_id}/reviews/'
+               f'{review.id}/comments/')
+        response, queries = count_queries(client, 'get', url)
+
+        assert response.status_code == 200
+        assert queries <= 3, (
+            f'GET `{url}` должен выполнять не больше 3 запросов к БД, '
+            f'выполнено {queries}'
+        )
+
+    def test_comment_compact_review(self, client, review):
+        comment = Comment.objects.create(review=review, author=review.author,
+                                         text='Комментарий')
+        url = (f'/api/v1/titles/{review.title_id}/reviews/'
+               f'{review.id}/comments/')
+
+        results = client.get(url).json()['results']
+        detail = client.get(f'{url}{comment.id}/').json()
+
+        assert results[0]['review'] == review.id
+        assert 'review_excerpt' not in results[0]
+        assert detail['review'] == review.id
+        assert 'review_excerpt' not in detail
+
+    @pytest.mark.parametrize('count', [1, 10])
+    def test_comment_review_excerpt(self, client, review, count):
+        review.text = 'Длинный отзыв. ' * 20
+        review.save()
+        for author in User.objects.all()[:count]:
+            Comment.objects.create(review=review, author=author,
+                                   text='Комментарий')
+        cache.clear()
+        url = (f'/api/v1/titles/{review.title_id}/reviews/'
+               f'{review.id}/comments/?review_excerpt=1')
+        response, queries = count_queries(client, 'get', url)
+
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == count
+        assert {item['review_excerpt'] for item in results} == {
+            review.text[:99] + '…'}
+        assert all(item['review'] == review.id for item in results)
+        assert queries <= 3, (
+            f'GET `{url}` должен выполнять не больше 3 запросов к БД, '
+            f'выполнено {queries}'
+        )
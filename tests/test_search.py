@@ -0,0 +1,54 @@
+import pytest
+from api.versions import bump_versions
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    for name in ('Крестный отец', 'Крестный отец 2', 'Отец', 'Матрица'):
+        Title.objects.create(name=name, year=2000, description='Описание',
+                             category=category)
+
+
+@pytest.mark.django_db
+class TestTrigramSearch:
+
+    def test_title_name_ranked(self, client, titles):
+        response = client.get('/api/v1/titles/?name=отец')
+
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Отец', 'Крестный отец', 'Крестный отец 2'], (
+            'Поиск по названию должен находить подстроку и ставить '
+            'ближайшие совпадения первыми'
+        )
+
+    def test_index_follows_changes(self, client, titles):
+        client.get('/api/v1/titles/?name=отец')
+        Title.objects.filter(name='Отец').get().delete()
+
+        response = client.get('/api/v1/titles/?name=отец')
+
+        assert len(response.json()['results']) == 2
+
+    def test_genre_search(self, client):
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+        response = client.get('/api/v1/genres/?search=драм')
+
+        assert [genre['slug'] for genre in response.json()['results']] == [
+            'drama']
+
+    def test_index_follows_versions(self, client, titles):
+        client.get('/api/v1/titles/?name=отец')
+        # Изменение в другом процессе: сигналы этого процесса его не видят.
+        Title.objects.filter(name='Матрица').update(name='Отец невесты')
+
+        stale = client.get('/api/v1/titles/?name=невест')
+        bump_versions(['titles'])
+        fresh = client.get('/api/v1/titles/?name=невест')
+
+        assert stale.json()['results'] == []
+        assert [title['name'] for title in fresh.json()['results']] == [
+            'Отец невесты']
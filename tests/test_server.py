@@ -0,0 +1,122 @@
+import asyncio
+import os
+import runpy
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from .conftest import root_dir
+
+project_dir = os.path.join(root_dir, 'api_yamdb')
+config_path = os.path.join(project_dir, 'api_yamdb', 'gunicorn_conf.py')
+
+
+def load_config(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(config_path)
+
+
+class TestServerConfig:
+
+    def test_wsgi_defaults(self, monkeypatch):
+        monkeypatch.delenv('SERVER_MODE', raising=False)
+        monkeypatch.delenv('GUNICORN_WORKERS', raising=False)
+        monkeypatch.delenv('GUNICORN_THREADS', raising=False)
+        config = load_config(monkeypatch)
+
+        assert config['wsgi_app'] == 'api_yamdb.wsgi:application'
+        assert config['worker_class'] == 'gthread'
+        assert config['workers'] == os.cpu_count() * 2 + 1
+        assert config['max_requests'] > 0 and config['preload_app']
+
+    def test_asgi_mode(self, monkeypatch):
+        config = load_config(monkeypatch, SERVER_MODE='asgi',
+                             GUNICORN_WORKERS='3')
+
+        assert config['wsgi_app'] == 'api_yamdb.asgi:application'
+        assert config['worker_class'] == 'uvicorn.workers.UvicornWorker'
+        assert config['workers'] == 3
+
+    def test_unknown_mode(self, monkeypatch):
+        with pytest.raises(RuntimeError):
+            load_config(monkeypatch, SERVER_MODE='fastcgi')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.parametrize('mode', ['wsgi', 'asgi'])
+def test_server_smoke(mode):
+    pytest.importorskip('gunicorn')
+    if mode == 'asgi':
+        pytest.importorskip('uvicorn')
+    port = free_port()
+    env = dict(os.environ, SERVER_MODE=mode, GUNICORN_WORKERS='1',
+               GUNICORN_BIND=f'127.0.0.1:{port}', GUNICORN_ACCESS_LOG='')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c',
+         'python:api_yamdb.gunicorn_conf'],
+        cwd=project_dir, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                with urllib.request.urlopen(
+                        f'http://127.0.0.1:{port}/redoc/', timeout=2) as r:
+                    assert r.status == 200
+                    assert 'Server-Timing' in r.headers
+                    break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    server.terminate()
+                    output = server.communicate(timeout=30)[0].decode()
+                    pytest.fail(f'gunicorn ({mode}) не запустился: '
+                                f'{output[-2000:]}')
+                time.sleep(0.2)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def test_asgi_requests_run_concurrently():
+    from api_yamdb import asgi
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wsgi_app(environ, start_response):
+        # Оба запроса должны одновременно оказаться внутри приложения.
+        barrier.wait()
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'ok']
+
+    async def request(application):
+        scope = {'type': 'http', 'method': 'GET', 'path': '/',
+                 'query_string': b'', 'http_version': '1.1', 'headers': []}
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            messages.append(message)
+
+        await application(scope, receive, send)
+        return messages[0]['status']
+
+    async def main():
+        application = type(asgi.application)(wsgi_app)
+        return await asyncio.gather(request(application),
+                                    request(application))
+
+    assert asyncio.run(main()) == [200, 200]
@@ -0,0 +1,139 @@
+import pytest
+from api.mixins import SparseFieldsMixin
+from api.serializers import SparseFieldsSerializerMixin
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from reviews.models import Category, Comment, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def review():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    title = Title.objects.create(name='Произведение', year=2000,
+                                 description='Описание', category=category)
+    for number in range(3):
+        user = User.objects.create(username=f'user{number}',
+                                   email=f'user{number}@yamdb.fake')
+        review = Review.objects.create(title=title, author=user,
+                                       text='Отзыв', score=number + 5)
+        Comment.objects.create(review=review, author=user, text='Коммент')
+    return review
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response.json(), [query['sql'] for query in context.captured_queries]
+
+
+@pytest.fixture(params=[True, False], ids=['values', 'serializer'])
+def fast_path(request, settings):
+    settings.VALUES_FAST_PATH = request.param
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('fast_path')
+class TestSparseFields:
+
+    def test_title_fields(self, client, review):
+        data, queries = get(client, '/api/v1/titles/?fields=id,name')
+
+        assert data['results'] == [
+            {'id': review.title_id, 'name': 'Произведение'}]
+        assert not any('description' in sql or 'reviews_category' in sql
+                       for sql in queries)
+
+    @pytest.mark.parametrize('expand, category', [
+        ('', {'name': 'Фильм', 'slug': 'movie'}),
+        ('&expand=', 'movie'),
+        ('&expand=category', {'name': 'Фильм', 'slug': 'movie'}),
+    ])
+    def test_title_expand(self, client, review, expand, category):
+        data, queries = get(
+            client, f'/api/v1/titles/?fields=id,category{expand}')
+
+        assert data['results'] == [
+            {'id': review.title_id, 'category': category}]
+        # Компактная категория — тот же JOIN, но читается только slug.
+        page_query = queries[-1]
+        assert '"reviews_category"."slug"' in page_query
+        assert ('"reviews_category"."name"' in page_query) == (
+            isinstance(category, dict))
+        assert '"reviews_title"."description"' not in page_query
+        assert len(queries) <= 2
+
+    def test_review_compact_title(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+
+        data, queries = get(client, f'{url}?fields=id,title,score&expand=')
+
+        assert data['results'][0] == {
+            'id': data['results'][0]['id'],
+            'title': review.title_id,
+            'score': 5,
+        }
+        page_query = queries[-1]
+        assert 'reviews_title"."name' not in page_query
+        assert 'users_user' not in page_query
+        assert 'text' not in page_query
+
+    def test_review_detail(self, client, review):
+        url = (f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+               '?fields=author,score')
+
+        data, queries = get(client, url)
+
+        assert data == {'author': 'user2', 'score': 7}
+        assert 'reviews_title' not in queries[-1]
+
+    def test_comment_fields_with_cursor(self, client, review):
+        Comment.objects.create(review=review, author=review.author,
+                               text='Ещё коммент')
+        url = (f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+               'comments/?fields=id&cursor=&limit=1')
+
+        first, queries = get(client, url)
+        cache.clear()
+        second, _ = get(client, first['next'])
+
+        assert len(queries) <= 3
+        assert list(first['results'][0]) == ['id']
+        assert second['next'] is None
+
+    def test_comment_method_field(self, client, review):
+        url = (f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+               'comments/?fields=id,review_excerpt&review_excerpt=1')
+        _, single = get(client, url)
+        for number in range(10):
+            Comment.objects.create(review=review, author=review.author,
+                                   text=f'Коммент {number}')
+        cache.clear()
+
+        data, queries = get(client, url)
+
+        assert len(queries) == len(single)
+        assert {item['review_excerpt'] for item in data['results']} == {
+            'Отзыв'}
+
+    def test_undeclared_method_field_keeps_columns(self):
+        class Serializer(SparseFieldsSerializerMixin,
+                         serializers.ModelSerializer):
+            summary = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Comment
+                fields = ('id', 'summary')
+
+        assert SparseFieldsMixin.get_sparse_columns(Serializer()) == (
+            None, None)
+
+    @pytest.mark.parametrize('query', [
+        'fields=id,rank', 'expand=genre', 'fields=id&expand=author'])
+    def test_unknown_names(self, client, review, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+
+        assert response.status_code == 400
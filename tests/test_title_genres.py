@@ -0,0 +1,135 @@
+import pytest
+from django.db import connection, transaction
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.signals import bulk_saved
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    return Title.objects.create(name='Произведение', year=2000,
+                                description='Описание', category=category)
+
+
+def stored_genres(title):
+    return Title.objects.get(pk=title.pk).genres
+
+
+@pytest.mark.django_db
+class TestTitleGenres:
+
+    def test_kept_in_sync(self, title):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+
+        title.genre.add(comedy, drama)
+        assert stored_genres(title) == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ]
+
+        title.genre.remove(comedy)
+        assert stored_genres(title) == [{'name': 'Драма', 'slug': 'drama'}]
+
+        drama.name = 'Трагедия'
+        drama.save()
+        assert stored_genres(title) == [
+            {'name': 'Трагедия', 'slug': 'drama'}]
+
+        drama.delete()
+        assert stored_genres(title) == []
+
+        comedy.title_set.add(title)
+        assert stored_genres(title) == [
+            {'name': 'Комедия', 'slug': 'comedy'}]
+
+    def test_list_and_filter_without_join(self, client, title):
+        title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?genre=comedy,drama')
+
+        assert response.json()['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+        assert not any('reviews_genre' in query['sql']
+                       for query in context.captured_queries), (
+            'Список и фильтр по жанру не должны обращаться к таблицам жанров'
+        )
+        response = client.get('/api/v1/titles/?genre=comedy')
+        assert response.json()['count'] == 0
+
+    def test_genre_delete_refreshes_once(self, title):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        titles = [title] + [
+            Title.objects.create(name=f'Произведение {number}', year=2000,
+                                 category=title.category)
+            for number in range(9)
+        ]
+        for item in titles:
+            item.genre.add(drama, comedy)
+
+        with CaptureQueriesContext(connection) as context:
+            drama.delete()
+
+        assert len(context.captured_queries) <= 10, (
+            'Удаление жанра не должно обновлять произведения по одному'
+        )
+        for item in titles:
+            assert stored_genres(item) == [
+                {'name': 'Комедия', 'slug': 'comedy'}]
+
+    def test_failed_genre_delete_keeps_refreshing(self, title):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        title.genre.add(drama)
+
+        def fail(**kwargs):
+            raise RuntimeError('удаление прервано')
+
+        post_delete.connect(fail, sender=GenreTitle)
+        try:
+            with pytest.raises(RuntimeError), transaction.atomic():
+                drama.delete()
+        finally:
+            post_delete.disconnect(fail, sender=GenreTitle)
+
+        title.genre.add(comedy)
+        title.genre.remove(drama)
+        assert stored_genres(title) == [
+            {'name': 'Комедия', 'slug': 'comedy'}]
+
+    def test_genre_queryset_delete(self, title):
+        title.genre.add(Genre.objects.create(name='Драма', slug='drama'),
+                        Genre.objects.create(name='Комедия', slug='comedy'))
+
+        Genre.objects.filter(slug='drama').delete()
+
+        assert stored_genres(title) == [
+            {'name': 'Комедия', 'slug': 'comedy'}]
+
+    def test_bulk_save_refreshes_affected_titles(self, title):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        other = Title.objects.create(name='Другое', year=2000,
+                                     category=title.category)
+        title.genre.add(drama)
+        other.genre.add(comedy)
+        Genre.objects.filter(pk__in=[drama.pk, comedy.pk]).update(
+            name='Переименован')
+
+        bulk_saved.send(sender=Genre, pks=[drama.pk])
+
+        assert stored_genres(title) == [
+            {'name': 'Переименован', 'slug': 'drama'}]
+        assert stored_genres(other) == [
+            {'name': 'Комедия', 'slug': 'comedy'}]
+
+        bulk_saved.send(sender=Genre)
+
+        assert stored_genres(other) == [
+            {'name': 'Переименован', 'slug': 'comedy'}]
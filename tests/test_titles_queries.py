@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
+
+
+def create_titles(count):
+    category, _ = Category.objects.get_or_create(name='Фильм', slug='movie')
+    genres = [
+        Genre.objects.get_or_create(name=slug, slug=slug)[0]
+        for slug in ('drama', 'comedy', 'thriller')
+    ]
+    for number in range(Title.objects.count(), count):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000,
+            description='Описание', category=category
+        )
+        title.genre.set(genres[:number % len(genres) + 1])
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+    )
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    @pytest.mark.parametrize('url', ['/api/v1/titles/'])
+    def test_title_list_query_count(self, client, url):
+        create_titles(5)
+        small_page = count_queries(client, url)
+        create_titles(50)
+        large_page = count_queries(client, url)
+
+        assert small_page == large_page, (
+            f'Количество запросов к БД при GET `{url}` зависит от '
+            f'размера страницы: {small_page} против {large_page}'
+        )
+        assert large_page <= 3, (
+            f'GET `{url}` должен выполнять не больше 3 запросов к БД, '
+            f'выполнено {large_page}'
+        )
+
+    def test_title_detail_query_count(self, client):
+        create_titles(3)
+        title = Title.objects.first()
+        url = f'/api/v1/titles/{title.id}/'
+        queries = count_queries(client, url)
+
+        assert queries <= 2, (
+            f'GET `{url}` должен выполнять не больше 2 запросов к БД, '
+            f'выполнено {queries}'
+        )
+
+
+@pytest.mark.django_db
+class TestTitleSlugFilters:
+
+    def test_genre_exact_multiple(self, client):
+        create_titles(6)
+        response = client.get('/api/v1/titles/?genre=comedy,thriller')
+
+        ids = [title['id'] for title in response.json()['results']]
+        expected = Title.objects.filter(
+            genre__slug__in=['comedy', 'thriller']).distinct()
+        assert sorted(ids) == sorted(expected.values_list('id', flat=True)), (
+            'Фильтр genre должен возвращать произведения без повторов'
+        )
+
+    def test_genre_exact_not_substring(self, client):
+        create_titles(3)
+
+        response = client.get('/api/v1/titles/?genre=dram')
+        assert response.json()['results'] == []
+
+        response = client.get('/api/v1/titles/?genre_contains=dram')
+        assert len(response.json()['results']) == 3
+
+    def test_category_exact(self, client):
+        create_titles(3)
+
+        response = client.get('/api/v1/titles/?category=movie')
+        assert len(response.json()['results']) == 3
+
+        response = client.get('/api/v1/titles/?category=mov')
+        assert response.json()['results'] == []
@@ -0,0 +1,84 @@
+import pytest
+from api.rows import get_row_mapper
+from api.serializers import CommentSerializer
+from django.core.cache import cache
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def catalog():
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    titles = [
+        Title.objects.create(name=f'Произведение {number}', year=2000,
+                             description='Описание «с кавычками» ',
+                             category=movie)
+        for number in range(5)
+    ]
+    titles[0].genre.add(drama, comedy)
+    titles[1].genre.add(drama)
+    users = [User.objects.create(username=f'user{number}',
+                                 email=f'user{number}@yamdb.fake')
+             for number in range(3)]
+    for score, user in enumerate(users, start=7):
+        review = Review.objects.create(title=titles[0], author=user,
+                                       text='Отзыв', score=score)
+        Comment.objects.create(review=review, author=user, text='Коммент')
+    return titles[0], review
+
+
+def get_both(client, settings, url):
+    responses = []
+    for enabled in (False, True):
+        settings.VALUES_FAST_PATH = enabled
+        cache.clear()
+        response = client.get(url)
+        assert response.status_code == 200
+        responses.append(response.content)
+    return responses
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', [
+    '/api/v1/titles/',
+    '/api/v1/titles/?limit=2&offset=1',
+    '/api/v1/titles/?cursor=&limit=2',
+    '/api/v1/titles/?genre=drama',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/?cursor=&limit=1',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/?cursor=',
+    '/api/v1/titles/{title}/reviews/{review}/comments/?review_excerpt=1',
+])
+def test_same_bytes_as_serializer(client, settings, catalog, url):
+    title, review = catalog
+    url = url.format(title=title.pk, review=review.pk)
+
+    serialized, fast = get_both(client, settings, url)
+
+    assert fast == serialized
+
+
+@pytest.mark.django_db
+def test_keyset_next_page_from_rows(client, settings, catalog):
+    settings.VALUES_FAST_PATH = True
+    first = client.get('/api/v1/titles/?cursor=&limit=2').json()
+    second = client.get(first['next']).json()
+
+    names = [item['name'] for item in first['results'] + second['results']]
+    assert names == [f'Произведение {number}' for number in range(4)]
+
+
+def test_unsupported_field_falls_back():
+    class Request:
+        method = 'GET'
+        query_params = {'review_excerpt': '1'}
+
+    serializer = CommentSerializer(context={'request': Request()})
+
+    assert 'review_excerpt' in serializer.fields
+    assert get_row_mapper(serializer) is None
+    assert get_row_mapper(CommentSerializer()).columns == [
+        'id', 'review__pk', 'author__username', 'text', 'pub_date']